@@ -1,5 +1,6 @@
 # dashboard_defense_iran_avance.py
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import numpy as np
 import plotly.express as px
@@ -8,6 +9,27 @@ from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import MappingProxyType
+from urllib.parse import urlencode
+import bisect
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zipfile
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -94,12 +116,768 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_figure_executor():
+    """Pool de threads partagé par toutes les sessions pour construire les graphiques"""
+    return ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 2),
+                              thread_name_prefix="figures")
+
+# Horizon de référence et pas de simulation (exprimés en années)
+ANNEE_DEBUT = 2000
+ANNEE_FIN = 2027
+ANNEE_FIN_MAX = 2100
+RESOLUTIONS = {
+    "Annuelle": 1.0,
+    "Mensuelle": 1 / 12,
+    "Journalière": 1 / 365.25,
+    "Horaire": 1 / (365.25 * 24)
+}
+TAILLE_CHUNK = 65_536
+TAILLE_CHUNK_JSON = 8_192
+POINTS_GRAPHIQUES = 2_000
+FENETRE_ANALYTIQUE_ANS = 3
+
+# Catalogue des missiles : dimensions filtrables et bandes de portée (km)
+DIMENSIONS_FILTRES = ('Type', 'Statut', 'Bande de portée', 'Bande de précision', 'Classification')
+BANDES_PORTEE = {
+    'bornes': [0, 300, 1000, 3000, 5500, np.inf],
+    'libelles': ["Courte (<300 km)", "Rapprochée (300-1000 km)", "Moyenne (1000-3000 km)",
+                 "Intermédiaire (3000-5500 km)", "Longue (>5500 km)"]
+}
+BANDES_PRECISION = {
+    'bornes': [0, 10, 50, 100, 500, np.inf],
+    'libelles': ["Très haute (≤10 m)", "Haute (10-50 m)", "Moyenne (50-100 m)",
+                 "Faible (100-500 m)", "Très faible (>500 m)"]
+}
+LIMITE_INVENTAIRE = 50
+
+# Normalisation des mesures du catalogue : facteurs vers le mètre
+UNITES_LONGUEUR = {'mm': 0.001, 'cm': 0.01, 'm': 1.0, 'km': 1000.0, 'ft': 0.3048, 'mi': 1609.344, 'nm': 1852.0}
+MOTIF_MESURE = r'^(?:cep)?[~≈<>=]*(\d+(?:\.\d+)?)([a-z]*)$'
+MOTIF_MILLIERS = r'^(?:cep)?[~≈<>=]*[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?[a-z]*$'
+COLONNES_CATALOGUE = ['Système', 'Type', 'Portée', 'Précision', 'Statut']
+
+# Prévisions : tendance linéaire ajustée sur les dernières années, intervalle de confiance à 95 %
+FENETRE_PREVISION_ANS = 10
+Z_CONFIANCE = 1.96
+ANNEES_PREVISION_DEFAUT = 8
+
+# Formats d'export : extension et type MIME (Parquet seulement si un moteur est installé)
+FORMATS_EXPORT = {
+    "CSV": ("csv", "text/csv"),
+    "JSON": ("json", "application/json")
+}
+if importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet"):
+    FORMATS_EXPORT["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+
+# Multiplicateurs appliqués par chaque scénario à partir de l'année de bascule
+ANNEE_BASCULE_SCENARIO = 2025
+DUREE_RAMPE_SCENARIO = 3
+# Évaluation des menaces : catalogue optionnel (CSV) et classement
+SCENARIOS_REPONSE = ['Attaque Aérienne', 'Blocus Naval', 'Cyber Attaque', 'Opérations Spéciales', 'Guerre Régionale']
+CAPACITES_REPONSE = ['Missiles', 'Marine', 'Proxies', 'Cyber']
+COLONNES_MENACES = ['Probabilité', 'Impact', 'Niveau Préparation']
+CRITERES_CLASSEMENT = {"Risque composite": 'Risque', "Écart de couverture": 'Écart_Couverture'}
+TOP_MENACES_DEFAUT = 10
+
+MODES_ANALYSE = ["Analyse Branche Militaire", "Programmes Stratégiques", "Vue Systémique", "Scénarios Géopolitiques"]
+
+SCENARIO_REFERENCE = "Statut Quo"
+SCENARIOS = {
+    SCENARIO_REFERENCE: {},
+    "Tensions Régionales": {
+        'Budget_Defense_Mds': 1.10, 'Exercices_Militaires': 1.20, 'Readiness_Operative': 1.04,
+        'Tests_Missiles': 1.25, 'Forces_Proxies': 1.15, 'Exercices_Guerre_Proximite': 1.20
+    },
+    "Sanctions Renforcées": {
+        'Budget_Defense_Mds': 0.85, 'PIB_Militaire_Pourcent': 0.90, 'Production_Armements': 0.90,
+        'Developpement_Technologique': 0.95, 'Production_Missiles_An': 0.85, 'Centrifuges_Operationnels': 0.80
+    },
+    "Conflit Ouvert": {
+        'Budget_Defense_Mds': 1.35, 'Personnel_Milliers': 1.20, 'Readiness_Operative': 1.06,
+        'Temps_Mobilisation_Jours': 0.60, 'Resilience_Logistique': 0.80, 'Couverture_AD': 0.85,
+        'Stock_Missiles': 0.75, 'Tests_Missiles': 1.50, 'Attaques_Cyber_Reussies': 1.40
+    }
+}
+
+# Familles de priorités qui conditionnent les colonnes générées
+FAMILLES_PRIORITES = {
+    'missiles': frozenset({"missiles", "missiles_balistiques", "missiles_croisiere",
+                           "missiles_courte_portee", "precision", "portee"}),
+    'asymetrique': frozenset({"asymetrique", "proxies", "operations_speciales", "sous_marins",
+                              "vedettes_rapides", "mines_marines", "missiles_anti_navires"}),
+    'cyber': frozenset({"cyber", "guerre_electronique"}),
+    'nucleaire': frozenset({"nucleaire"})
+}
+
+# Priorités reconnues sans colonne dédiée
+PRIORITES_CONTEXTUELLES = frozenset({
+    "defense_aerienne", "defense_territoriale", "defense_cotiere", "artillerie",
+    "drones", "renseignement", "reseau_radar"
+})
+
+@dataclass(frozen=True, slots=True)
+class ConfigAvancee:
+    """Configuration figée d'une branche ou d'un programme, drapeaux de priorité précalculés"""
+    nom: str
+    type: str
+    budget_base: float = 12.0
+    personnel_base: float = 500
+    exercices_base: float = 60
+    priorites: tuple = ()
+    details: MappingProxyType = field(default_factory=lambda: MappingProxyType({}), compare=False)
+    prio_missiles: bool = field(init=False)
+    prio_asymetrique: bool = field(init=False)
+    prio_cyber: bool = field(init=False)
+    prio_nucleaire: bool = field(init=False)
+    
+    def __post_init__(self):
+        priorites = frozenset(self.priorites)
+        for famille, membres in FAMILLES_PRIORITES.items():
+            object.__setattr__(self, f'prio_{famille}', not priorites.isdisjoint(membres))
+
+# Bornes physiques appliquées après les effets des événements et du scénario
+BORNES_SERIES = {'Readiness_Operative': (None, 92)}
+
+def apply_series_bounds(data):
+    """Ramène les séries bornées dans leurs limites physiques"""
+    for serie, (minimum, maximum) in BORNES_SERIES.items():
+        if serie in data:
+            data[serie] = np.clip(data[serie], minimum, maximum)
+    return data
+
+class ChronologieEvenements:
+    """Chronologie indexée par intervalles : effets cumulés précalculés par segment élémentaire.
+    
+    Un événement couvre l'intervalle fermé [Début, Fin] ; l'appliquer coûte un searchsorted par bloc,
+    quel que soit le nombre d'événements."""
+    
+    def __init__(self, evenements):
+        self.evenements = evenements
+        debuts = evenements['Début'].to_numpy(dtype=float)
+        fins = np.nextafter(evenements['Fin'].to_numpy(dtype=float), np.inf)  # Borne exclusive
+        self.bornes = np.unique(np.concatenate([debuts, fins[np.isfinite(fins)]]))
+        planchers = np.concatenate([[-np.inf], self.bornes])
+        actifs = (debuts[:, None] <= planchers) & (fins[:, None] > planchers)  # Événements × segments
+        
+        valeurs = evenements['Valeur'].to_numpy(dtype=float)[:, None]
+        multiplicatifs = (evenements['Effet'] == '×').to_numpy()[:, None]
+        self.effets = {}
+        for serie in evenements['Série'].dropna().unique():
+            lignes = (evenements['Série'] == serie).to_numpy()
+            self.effets[serie] = (
+                np.where(actifs[lignes] & multiplicatifs[lignes], valeurs[lignes], 1.0).prod(axis=0),
+                np.where(actifs[lignes] & ~multiplicatifs[lignes], valeurs[lignes], 0.0).sum(axis=0)
+            )
+    
+    def appliquer(self, data, annees):
+        """Applique tous les effets en une passe vectorisée : série × facteur cumulé + ajout cumulé"""
+        segments = np.searchsorted(self.bornes, np.asarray(annees, dtype=float), side='right')
+        for serie, (facteurs, ajouts) in self.effets.items():
+            if serie in data:
+                data[serie] = data[serie] * facteurs[segments] + ajouts[segments]
+        return data
+    
+    def bandes(self):
+        """Intervalles fusionnés des événements de durée finie : (début, fin, libellé)"""
+        periodes = self.evenements[(self.evenements['Fin'] > self.evenements['Début'])
+                                   & np.isfinite(self.evenements['Fin'])].sort_values('Début')
+        fins_precedentes = np.maximum.accumulate(periodes['Fin'].to_numpy(dtype=float))
+        groupes = np.cumsum(np.concatenate([[True], periodes['Début'].to_numpy()[1:] > fins_precedentes[:-1]]))
+        fusion = periodes.groupby(groupes).agg(debut=('Début', 'min'), fin=('Fin', 'max'),
+                                                libelle=('Événement', ' / '.join))
+        return list(fusion.itertuples(index=False, name=None))
+    
+    def jalons(self):
+        """Événements sans fin qui modifient une série, regroupés par année : (année, libellé)"""
+        ruptures = self.evenements[~np.isfinite(self.evenements['Fin']) & self.evenements['Série'].notna()]
+        return list(ruptures.groupby('Début')['Événement'].agg(' / '.join).items())
+    
+    def sanctions(self):
+        """Événements notés pour le graphique des sanctions"""
+        notes = self.evenements[self.evenements['Impact_Sanctions'].notna()]
+        return pd.DataFrame({'Année': notes['Début'].astype(int), 'Sanctions': notes['Événement'],
+                             'Impact': notes['Impact_Sanctions'].astype(int)}).reset_index(drop=True)
+
+def slugify(texte):
+    """Nom de fichier sûr à partir d'un libellé"""
+    return re.sub(r'\W+', '_', texte).strip('_')
+
+def hex_to_rgba(couleur, alpha):
+    """Couleur hexadécimale vers rgba() avec transparence"""
+    rouge, vert, bleu = (int(couleur[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({rouge}, {vert}, {bleu}, {alpha})"
+
+class FigureSerialisee(go.Figure):
+    """Graphique converti en dictionnaire dans le pool : st.plotly_chart n'a plus qu'à encoder le JSON"""
+    
+    def __init__(self, fig):
+        super().__init__()
+        self._spec = fig.to_dict()
+    
+    def to_dict(self):
+        return self._spec
+
+def serialize_figure(fig):
+    return None if fig is None else FigureSerialisee(fig)
+
+def content_hash(df):
+    """Empreinte du contenu d'une table (valeurs, index et colonnes)"""
+    empreinte = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    empreinte.update(repr(list(df.columns)).encode('utf-8'))
+    return empreinte.hexdigest()
+
+@st.cache_resource
+def get_export_jobs():
+    """Exports complets partagés : un seul worker dédié pour ne pas pénaliser les autres sessions"""
+    return {
+        'executor': ThreadPoolExecutor(max_workers=1, thread_name_prefix="exports"),
+        'taches': {},
+        'verrou': threading.Lock(),
+        'dossier': tempfile.mkdtemp(prefix="dashboard_iran_exports_")
+    }
+
+# Console SQL : base SQLite en mémoire alimentée par chaque sélection × scénario (vue annuelle par défaut)
+RESOLUTION_SQL = "Annuelle"
+INTERVALLE_SYNCHRO_SQL = 60
+LIMITE_RESULTATS_SQL = 10_000
+DELAI_REQUETE_SQL = 2.0
+ACTIONS_SQL_AUTORISEES = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                          getattr(sqlite3, 'SQLITE_RECURSIVE', 33)}
+EXEMPLES_SQL = {
+    "Couverture AD en hausse de plus de 2 points pendant une baisse du budget": """SELECT * FROM (
+    SELECT selection, scenario, Annee,
+           Couverture_AD - LAG(Couverture_AD) OVER w AS hausse_couverture_ad,
+           Budget_Defense_Mds - LAG(Budget_Defense_Mds) OVER w AS variation_budget
+    FROM donnees
+    WINDOW w AS (PARTITION BY selection, scenario ORDER BY Annee)
+)
+WHERE hausse_couverture_ad > 2 AND variation_budget < 0
+ORDER BY selection, scenario, Annee""",
+    "Budget final par sélection et scénario": """SELECT selection, scenario, Budget_Defense_Mds
+FROM donnees
+WHERE Annee = (SELECT MAX(Annee) FROM donnees)
+ORDER BY Budget_Defense_Mds DESC""",
+    "Moyennes par scénario": """SELECT scenario, AVG(Budget_Defense_Mds) AS budget_moyen,
+       AVG(Readiness_Operative) AS readiness_moyenne, AVG(Couverture_AD) AS couverture_ad_moyenne
+FROM donnees
+GROUP BY scenario
+ORDER BY budget_moyen DESC"""
+}
+
+class BaseRequetes:
+    """Base SQLite en mémoire : une table large, rechargée par vue uniquement quand son contenu change"""
+    
+    def __init__(self):
+        self.connexion = sqlite3.connect(":memory:", check_same_thread=False)
+        self.verrou = threading.Lock()
+        self.empreintes = {}
+        self.colonnes = ['Annee']
+        self.derniere_synchro = None
+        with self.connexion:
+            self.connexion.execute("CREATE TABLE donnees (selection TEXT NOT NULL, scenario TEXT NOT NULL, Annee INTEGER)")
+            self.connexion.execute("CREATE INDEX idx_donnees_selection ON donnees (selection, scenario, Annee)")
+            self.connexion.execute("CREATE INDEX idx_donnees_scenario ON donnees (scenario)")
+            self.connexion.execute("CREATE INDEX idx_donnees_annee ON donnees (Annee)")
+    
+    def a_synchroniser(self):
+        """Vrai au premier usage puis au plus une fois par intervalle"""
+        return self.derniere_synchro is None or time.monotonic() - self.derniere_synchro > INTERVALLE_SYNCHRO_SQL
+    
+    def synchroniser(self, vues):
+        """Réinsère en une transaction les vues {(selection, scenario): df} dont l'empreinte a changé"""
+        rechargees = 0
+        with self.verrou, self.connexion:
+            for (selection, scenario), df in vues.items():
+                empreinte = content_hash(df)
+                if self.empreintes.get((selection, scenario)) == empreinte:
+                    continue
+                
+                for colonne in df.columns:
+                    if colonne not in self.colonnes:
+                        self.connexion.execute(f'ALTER TABLE donnees ADD COLUMN "{colonne}" REAL')
+                        self.colonnes.append(colonne)
+                
+                noms = ", ".join(f'"{colonne}"' for colonne in df.columns)
+                marques = ", ".join("?" * len(df.columns))
+                self.connexion.execute("DELETE FROM donnees WHERE selection = ? AND scenario = ?", (selection, scenario))
+                self.connexion.executemany(
+                    f"INSERT INTO donnees (selection, scenario, {noms}) VALUES (?, ?, {marques})",
+                    ((selection, scenario, *ligne) for ligne in df.to_numpy(dtype=float).tolist())
+                )
+                self.empreintes[(selection, scenario)] = empreinte
+                rechargees += 1
+            self.derniere_synchro = time.monotonic()
+        return rechargees
+    
+    def executer(self, requete):
+        """Exécute une requête en lecture seule, bornée en durée et en nombre de lignes"""
+        echeance = time.perf_counter() + DELAI_REQUETE_SQL
+        autoriser = lambda action, *_: sqlite3.SQLITE_OK if action in ACTIONS_SQL_AUTORISEES else sqlite3.SQLITE_DENY
+        
+        with self.verrou:
+            self.connexion.set_authorizer(autoriser)
+            self.connexion.set_progress_handler(lambda: time.perf_counter() > echeance, 10_000)
+            try:
+                curseur = self.connexion.execute(requete)
+                lignes = curseur.fetchmany(LIMITE_RESULTATS_SQL + 1)
+                colonnes = [description[0] for description in curseur.description or ()]
+            finally:
+                self.connexion.set_progress_handler(None, 0)
+                self.connexion.set_authorizer(None)
+        
+        return pd.DataFrame(lignes[:LIMITE_RESULTATS_SQL], columns=colonnes), len(lignes) > LIMITE_RESULTATS_SQL
+
+@st.cache_resource
+def get_query_database():
+    """Base de requêtes partagée par toutes les sessions"""
+    return BaseRequetes()
+
+# Versions des données : colonnes adressées par leur contenu, partagées entre versions (copie sur écriture)
+RESOLUTION_INSTANTANES = "Annuelle"
+
+class MagasinInstantanes:
+    """Versions des simulations : objets .npy par empreinte de colonne, versions JSON vue → colonnes → empreinte"""
+    
+    def __init__(self, dossier):
+        self.dossier_objets = os.path.join(dossier, 'objets')
+        self.dossier_versions = os.path.join(dossier, 'versions')
+        self.verrou = threading.Lock()
+        self.manifestes = {}  # Versions immuables : lues et comparées une seule fois
+        self.ecarts = {}
+    
+    def ecrire_atomique(self, chemin, ecrire):
+        """Écrit dans un fichier temporaire du même dossier puis le renomme"""
+        descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin))
+        with os.fdopen(descripteur, 'wb') as fichier:
+            ecrire(fichier)
+        os.replace(temporaire, chemin)
+    
+    def enregistrer_colonne(self, valeurs):
+        """Stocke une colonne si son contenu est nouveau ; renvoie (empreinte, octets écrits)"""
+        valeurs = np.ascontiguousarray(valeurs)
+        empreinte = hashlib.sha256(valeurs.dtype.str.encode() + valeurs.tobytes()).hexdigest()
+        chemin = os.path.join(self.dossier_objets, f"{empreinte}.npy")
+        if os.path.exists(chemin):
+            return empreinte, 0
+        self.ecrire_atomique(chemin, lambda fichier: np.save(fichier, valeurs, allow_pickle=False))
+        return empreinte, valeurs.nbytes
+    
+    def capturer(self, vues, libelle=""):
+        """Crée une version à partir de {(selection, scenario): df} ; seules les colonnes modifiées sont écrites"""
+        with self.verrou:
+            # Dossiers créés à la première capture : un emplacement non inscriptible ne gêne que la capture
+            os.makedirs(self.dossier_objets, exist_ok=True)
+            os.makedirs(self.dossier_versions, exist_ok=True)
+            manifeste, nouveaux, octets = {}, 0, 0
+            for (selection, scenario), df in vues.items():
+                colonnes = {}
+                for colonne in df.columns:
+                    colonnes[colonne], ecrits = self.enregistrer_colonne(df[colonne].to_numpy())
+                    nouveaux += ecrits > 0
+                    octets += ecrits
+                manifeste[f"{selection}|{scenario}"] = colonnes
+            
+            empreinte = hashlib.sha256(json.dumps(manifeste, sort_keys=True).encode()).hexdigest()
+            identifiant = f"{datetime.now():%Y%m%d-%H%M%S}-{empreinte[:8]}"
+            version = {'id': identifiant, 'cree_le': datetime.now().isoformat(timespec='seconds'),
+                       'libelle': libelle, 'empreinte': empreinte, 'vues': manifeste}
+            self.ecrire_atomique(os.path.join(self.dossier_versions, f"{identifiant}.json"),
+                                 lambda fichier: fichier.write(json.dumps(version, ensure_ascii=False).encode('utf-8')))
+        return identifiant, nouveaux, octets
+    
+    def versions(self):
+        """Versions disponibles, de la plus récente à la plus ancienne"""
+        if not os.path.isdir(self.dossier_versions):
+            return []
+        return sorted((nom[:-5] for nom in os.listdir(self.dossier_versions) if nom.endswith('.json')), reverse=True)
+    
+    def lire_version(self, identifiant):
+        if identifiant not in self.manifestes:
+            with open(os.path.join(self.dossier_versions, f"{identifiant}.json"), encoding='utf-8') as fichier:
+                self.manifestes[identifiant] = json.load(fichier)
+        return self.manifestes[identifiant]
+    
+    def lire_colonne(self, empreinte):
+        """Colonne projetée en mémoire (mmap) : les pages sont partagées entre lectures"""
+        return np.load(os.path.join(self.dossier_objets, f"{empreinte}.npy"), mmap_mode='r', allow_pickle=False)
+    
+    def charger(self, identifiant, selection, scenario):
+        """Table d'une vue telle qu'enregistrée dans une version"""
+        colonnes = self.lire_version(identifiant)['vues'][f"{selection}|{scenario}"]
+        return pd.DataFrame({colonne: self.lire_colonne(empreinte) for colonne, empreinte in colonnes.items()})
+    
+    def comparer(self, identifiant_a, identifiant_b):
+        """Écarts entre deux versions ; les colonnes d'empreinte identique ne sont jamais lues"""
+        if (identifiant_a, identifiant_b) not in self.ecarts:
+            self.ecarts[(identifiant_a, identifiant_b)] = self.calculer_ecarts(identifiant_a, identifiant_b)
+        return self.ecarts[(identifiant_a, identifiant_b)]
+    
+    def calculer_ecarts(self, identifiant_a, identifiant_b):
+        vues_a, vues_b = self.lire_version(identifiant_a)['vues'], self.lire_version(identifiant_b)['vues']
+        lignes = []
+        for vue in sorted(vues_a.keys() | vues_b.keys()):
+            colonnes_a, colonnes_b = vues_a.get(vue, {}), vues_b.get(vue, {})
+            selection, scenario = vue.split('|', 1)
+            for colonne in sorted(colonnes_a.keys() | colonnes_b.keys()):
+                empreinte_a, empreinte_b = colonnes_a.get(colonne), colonnes_b.get(colonne)
+                if empreinte_a == empreinte_b:
+                    continue
+                
+                ligne = {'Sélection': selection, 'Scénario': scenario, 'Colonne': colonne,
+                         'Statut': 'Ajoutée' if empreinte_a is None else 'Supprimée' if empreinte_b is None else 'Modifiée',
+                         'Écart_Max': np.nan, 'Écart_Moyen': np.nan, 'Lignes_Modifiées': np.nan}
+                if ligne['Statut'] == 'Modifiée':
+                    a, b = self.lire_colonne(empreinte_a), self.lire_colonne(empreinte_b)
+                    if a.shape == b.shape:
+                        ecart = np.asarray(b, dtype=float) - np.asarray(a, dtype=float)
+                        ligne.update({'Écart_Max': np.abs(ecart).max(), 'Écart_Moyen': ecart.mean(),
+                                      'Lignes_Modifiées': int(np.count_nonzero(ecart))})
+                lignes.append(ligne)
+        return pd.DataFrame(lignes, columns=['Sélection', 'Scénario', 'Colonne', 'Statut',
+                                             'Écart_Max', 'Écart_Moyen', 'Lignes_Modifiées'])
+    
+    def taille(self):
+        """Nombre d'objets et octets occupés sur disque"""
+        if not os.path.isdir(self.dossier_objets):
+            return 0, 0
+        tailles = [entree.stat().st_size for entree in os.scandir(self.dossier_objets) if entree.name.endswith('.npy')]
+        return len(tailles), sum(tailles)
+
+@st.cache_resource
+def get_snapshot_store():
+    """Magasin de versions partagé ; DASHBOARD_SNAPSHOTS_DIR choisit son emplacement"""
+    dossier = os.environ.get('DASHBOARD_SNAPSHOTS_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots'))
+    return MagasinInstantanes(dossier)
+
+# Métriques opérationnelles exposées au format texte Prometheus
+BUCKETS_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DUREE_SESSION_ACTIVE = 300
+CLES_SUIVIES_PAR_CACHE = 2048  # Clés mémorisées par cache pour repérer les évictions (LRU)
+FENETRE_MISS_CONCURRENTS = 5.0  # Deux miss d'une même clé aussi rapprochés : calcul simultané, pas une éviction
+METADONNEES_METRIQUES = {
+    'dashboard_reruns_total': ('counter', "Nombre d'exécutions complètes du script"),
+    'dashboard_rerun_seconds': ('histogram', "Durée d'une exécution complète, graphiques compris"),
+    'dashboard_tab_render_seconds': ('histogram', "Durée de rendu de chaque onglet, hors graphiques"),
+    'dashboard_tab_figures_seconds': ('histogram', "Attente des graphiques de chaque onglet, de la réservation à l'affichage du dernier"),
+    'dashboard_generate_seconds': ('histogram', "Durée de génération et de lecture du flux de simulation"),
+    'dashboard_figure_build_seconds': ('histogram', "Durée de construction de chaque graphique"),
+    'dashboard_cache_calls_total': ('counter', "Appels aux fonctions en cache"),
+    'dashboard_cache_hits_total': ('counter', "Appels servis depuis le cache"),
+    'dashboard_cache_misses_total': ('counter', "Appels ayant recalculé le résultat"),
+    'dashboard_cache_evictions_total': ('counter', "Recalculs d'une clé déjà calculée (entrée évincée)"),
+    'dashboard_warmup_view_seconds': ('histogram', "Durée de préchauffage d'une vue (sélection × scénario)"),
+    'dashboard_active_sessions': ('gauge', f"Sessions actives sur les {DUREE_SESSION_ACTIVE} dernières secondes"),
+    'dashboard_process_resident_memory_bytes': ('gauge', "Mémoire résidente du processus")
+}
+
+class MetriquesOperationnelles:
+    """Métriques opérationnelles : enregistrement sans verrou, agrégation à la collecte"""
+    
+    def __init__(self):
+        self.evenements = deque()
+        self.verrou = threading.Lock()  # Pris uniquement par l'agrégation, jamais par le rerun
+        self.compteurs = defaultdict(float)
+        self.histogrammes = {}
+        self.sessions = {}
+        self.cles_calculees = defaultdict(OrderedDict)
+    
+    # Chemin chaud : un simple append atomique sur une deque
+    def incrementer(self, nom, valeur=1, **labels):
+        self.evenements.append(('compteur', nom, tuple(sorted(labels.items())), valeur))
+    
+    def observer(self, nom, valeur, **labels):
+        self.evenements.append(('histogramme', nom, tuple(sorted(labels.items())), valeur))
+    
+    def enregistrer_miss(self, cache, cle):
+        self.evenements.append(('miss', cache, (), (cle, time.time())))
+    
+    def enregistrer_session(self, session_id):
+        self.evenements.append(('session', session_id, (), time.time()))
+    
+    @contextmanager
+    def mesurer(self, nom, **labels):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observer(nom, time.perf_counter() - debut, **labels)
+    
+    def agreger(self):
+        """Vide la file d'événements dans les agrégats"""
+        with self.verrou:
+            while self.evenements:
+                type_evenement, nom, labels, valeur = self.evenements.popleft()
+                if type_evenement == 'compteur':
+                    self.compteurs[(nom, labels)] += valeur
+                elif type_evenement == 'histogramme':
+                    etat = self.histogrammes.setdefault((nom, labels), [[0] * (len(BUCKETS_LATENCE) + 1), 0.0])
+                    etat[0][bisect.bisect_left(BUCKETS_LATENCE, valeur)] += 1
+                    etat[1] += valeur
+                elif type_evenement == 'miss':
+                    labels = (('cache', nom),)
+                    cle, instant = valeur
+                    cles = self.cles_calculees[nom]
+                    self.compteurs[('dashboard_cache_misses_total', labels)] += 1
+                    precedent = cles.pop(cle, None)
+                    if precedent is not None and instant - precedent > FENETRE_MISS_CONCURRENTS:
+                        self.compteurs[('dashboard_cache_evictions_total', labels)] += 1
+                    cles[cle] = instant
+                    if len(cles) > CLES_SUIVIES_PAR_CACHE:
+                        cles.popitem(last=False)
+                else:
+                    self.sessions[nom] = valeur
+            
+            limite = time.time() - DUREE_SESSION_ACTIVE
+            self.sessions = {session: vu for session, vu in self.sessions.items() if vu >= limite}
+    
+    def exposer(self):
+        """Texte au format d'exposition Prometheus"""
+        self.agreger()
+        with self.verrou:
+            compteurs = dict(self.compteurs)
+            histogrammes = {cle: (list(etat[0]), etat[1]) for cle, etat in self.histogrammes.items()}
+            sessions_actives = len(self.sessions)
+        
+        for (nom, labels), appels in list(compteurs.items()):
+            if nom == 'dashboard_cache_calls_total':
+                echecs = compteurs.get(('dashboard_cache_misses_total', labels), 0)
+                compteurs[('dashboard_cache_hits_total', labels)] = max(appels - echecs, 0)
+        jauges = {
+            ('dashboard_active_sessions', ()): sessions_actives,
+            ('dashboard_process_resident_memory_bytes', ()): memoire_residente()
+        }
+        
+        lignes = []
+        for metrique, (type_metrique, aide) in METADONNEES_METRIQUES.items():
+            lignes += [f"# HELP {metrique} {aide}", f"# TYPE {metrique} {type_metrique}"]
+            if type_metrique == 'histogram':
+                for (nom, labels), (compte_buckets, somme) in sorted(histogrammes.items()):
+                    if nom != metrique:
+                        continue
+                    cumul = 0
+                    for borne, compte in zip((*BUCKETS_LATENCE, '+Inf'), compte_buckets):
+                        cumul += compte
+                        lignes.append(f"{nom}_bucket{format_labels(labels + (('le', str(borne)),))} {cumul}")
+                    lignes.append(f"{nom}_sum{format_labels(labels)} {somme}")
+                    lignes.append(f"{nom}_count{format_labels(labels)} {cumul}")
+            else:
+                valeurs = compteurs if type_metrique == 'counter' else jauges
+                for (nom, labels), valeur in sorted(valeurs.items()):
+                    if nom == metrique:
+                        lignes.append(f"{nom}{format_labels(labels)} {float(valeur)!r}")
+        return "\n".join(lignes) + "\n"
+    
+    def demarrer(self, hote, port):
+        """Lance l'agrégation périodique et le point de collecte HTTP local"""
+        def agregation_periodique():
+            while True:
+                time.sleep(1)
+                self.agreger()
+        threading.Thread(target=agregation_periodique, name="metriques-agregation", daemon=True).start()
+        
+        metriques = self
+        
+        class GestionnaireMetriques(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                corps = metriques.exposer().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+            
+            def log_message(self, *args):
+                pass
+        
+        try:
+            serveur = ThreadingHTTPServer((hote, port), GestionnaireMetriques)
+        except OSError as exc:
+            logging.getLogger(__name__).warning("Point de collecte des métriques indisponible sur %s:%s : %s", hote, port, exc)
+            return None
+        serveur.daemon_threads = True
+        threading.Thread(target=serveur.serve_forever, name="metriques-http", daemon=True).start()
+        return serveur
+
+def format_labels(labels):
+    """Étiquettes Prometheus échappées : {cle="valeur",...}"""
+    if not labels:
+        return ""
+    echapper = lambda valeur: str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{cle}="{echapper(valeur)}"' for cle, valeur in labels) + "}"
+
+def memoire_residente():
+    """Mémoire résidente du processus en octets (/proc sous Linux, pic RSS sinon)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# Préchauffage : vues par défaut (horizon et résolution initiaux) de chaque sélection × scénario
+PRIORITE_PRECHAUFFAGE = 19
+PAUSE_PRECHAUFFAGE = 0.05
+
+class PrechauffageCaches:
+    """Préchauffage des caches en tâche de fond, à basse priorité, sans bloquer les sessions"""
+    
+    def __init__(self, mode, top, fichier_usage):
+        self.mode = mode
+        self.top = top
+        self.fichier_usage = fichier_usage
+        self.verrou = threading.Lock()
+        self.usage = self.lire_usage()
+        self.vues = []
+        self.faites = 0
+        self.en_cours = None
+        self.erreurs = []
+        self.debut = self.duree = None
+    
+    def lire_usage(self):
+        """Compteurs d'ouverture par sélection, conservés entre deux démarrages"""
+        try:
+            with open(self.fichier_usage) as fichier:
+                return {selection: int(compte) for selection, compte in json.load(fichier).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+    
+    def enregistrer_usage(self, selection):
+        """Compte une ouverture de sélection et réécrit le fichier de façon atomique"""
+        with self.verrou:
+            self.usage[selection] = self.usage.get(selection, 0) + 1
+            copie = dict(self.usage)
+        try:
+            descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(self.fichier_usage) or '.')
+            with os.fdopen(descripteur, 'w') as fichier:
+                json.dump(copie, fichier)
+            os.replace(temporaire, self.fichier_usage)
+        except OSError as exc:
+            logging.getLogger(__name__).warning("Compteurs d'usage non enregistrés : %s", exc)
+    
+    def selections(self, toutes):
+        """Sélections les plus utilisées d'abord ; limitées aux N premières en mode 'top'"""
+        classees = sorted(toutes, key=lambda selection: -self.usage.get(selection, 0))
+        return classees[:self.top] if self.mode == 'top' else classees
+    
+    def demarrer(self, selections):
+        """Lance le préchauffage dans un thread démon"""
+        self.vues = [(selection, scenario) for selection in self.selections(selections) for scenario in SCENARIOS]
+        threading.Thread(target=self.executer, name="prechauffage", daemon=True).start()
+    
+    def executer(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PRIORITE_PRECHAUFFAGE)
+        except (AttributeError, OSError):
+            pass  # Priorité par thread indisponible hors Linux
+        
+        metriques = get_operational_metrics()
+        dashboard = DefenseIranDashboardAvance()
+        self.debut = time.perf_counter()
+        dashboard.warm_static_caches()
+        for selection, scenario in self.vues:
+            self.en_cours = f"{selection} / {scenario}"
+            try:
+                with metriques.mesurer('dashboard_warmup_view_seconds'):
+                    dashboard.warm_view(selection, scenario)
+            except Exception as exc:
+                self.erreurs.append(f"{self.en_cours} : {exc}")
+            self.faites += 1
+            time.sleep(PAUSE_PRECHAUFFAGE)  # Laisse le GIL aux sessions réelles
+        self.en_cours = None
+        self.duree = time.perf_counter() - self.debut
+
+class FiltrePrechauffage(logging.Filter):
+    """Masque l'avertissement de contexte absent émis par les spinners appelés depuis le préchauffage"""
+    
+    def filter(self, record):
+        return record.threadName not in ("prechauffage", "demarrage")
+
+@st.cache_resource
+def get_cache_warmup():
+    """Préchauffage démarré avec le serveur (python Dashboard.py) ou à la première exécution ; DASHBOARD_WARMUP=all|top|off"""
+    mode = os.environ.get('DASHBOARD_WARMUP', 'all').lower()
+    prechauffage = PrechauffageCaches(
+        mode, int(os.environ.get('DASHBOARD_WARMUP_TOP', 5)),
+        os.environ.get('DASHBOARD_USAGE_FILE', os.path.join(tempfile.gettempdir(), 'dashboard_iran_usage.json'))
+    )
+    if mode != 'off':
+        logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(FiltrePrechauffage())
+        dashboard = DefenseIranDashboardAvance()
+        prechauffage.demarrer(list(dashboard.config_registry))
+    return prechauffage
+
+@st.cache_resource
+def get_operational_metrics():
+    """Métriques partagées par toutes les sessions ; DASHBOARD_METRICS_PORT=0 désactive l'endpoint"""
+    metriques = MetriquesOperationnelles()
+    port = int(os.environ.get('DASHBOARD_METRICS_PORT', 9464) or 0)
+    if port:
+        metriques.demarrer(os.environ.get('DASHBOARD_METRICS_HOST', '127.0.0.1'), port)
+    return metriques
+
+def cached_call(cache, fonction, *args):
+    """Appel d'une fonction en cache, compté pour les métriques de succès et d'échec"""
+    get_operational_metrics().incrementer('dashboard_cache_calls_total', cache=cache)
+    return fonction(*args)
+
+@st.cache_resource
+def build_event_timeline(_dashboard):
+    """Construit une seule fois l'index de la chronologie des événements"""
+    evenements = _dashboard.define_event_timeline()
+    inconnus = set(evenements['Effet'].dropna()) - {'×', '+'}
+    if inconnus:
+        raise ValueError(f"Effets d'événement inconnus : {sorted(inconnus)}")
+    if (evenements['Fin'] < evenements['Début']).any():
+        raise ValueError("Un événement se termine avant de commencer")
+    return ChronologieEvenements(evenements)
+
+@st.cache_resource
+def build_config_registry(_dashboard):
+    """Construit et valide une seule fois le registre des configurations"""
+    configs = _dashboard.define_advanced_configs()
+    selections = _dashboard.branches_options + _dashboard.programmes_options + ["Scénarios Géopolitiques"]
+    
+    manquantes = [selection for selection in selections if selection not in configs]
+    if manquantes:
+        raise ValueError(f"Configuration manquante pour : {', '.join(manquantes)}")
+    
+    priorites_connues = PRIORITES_CONTEXTUELLES.union(*FAMILLES_PRIORITES.values())
+    registre = {}
+    for nom, brut in configs.items():
+        valeurs = dict(brut)
+        priorites = tuple(valeurs.pop('priorites'))
+        inconnues = set(priorites) - priorites_connues
+        if inconnues:
+            raise ValueError(f"{nom} : priorités inconnues {sorted(inconnues)}")
+        
+        bases = {cle: valeurs.pop(cle) for cle in ('budget_base', 'personnel_base', 'exercices_base')
+                 if cle in valeurs}
+        if any(valeur <= 0 for valeur in bases.values()):
+            raise ValueError(f"{nom} : les valeurs de base doivent être positives")
+        
+        details = {cle: tuple(valeur) if isinstance(valeur, list) else valeur
+                   for cle, valeur in valeurs.items() if cle != 'type'}
+        registre[nom] = ConfigAvancee(nom=nom, type=valeurs['type'], priorites=priorites,
+                                      details=MappingProxyType(details), **bases)
+    
+    return MappingProxyType(registre)
+
 class DefenseIranDashboardAvance:
     def __init__(self):
         self.branches_options = self.define_branches_options()
         self.programmes_options = self.define_programmes_options()
         self.missile_systems = self.define_missile_systems()
         self.naval_assets = self.define_naval_assets()
+        self.config_registry = build_config_registry(self)
+        self.chronologie = build_event_timeline(self)
+        self.figures_en_attente = []
+        self.onglet_courant = None
+        self.cle_vue = None
         
     def define_branches_options(self):
         return [
@@ -134,12 +912,152 @@ class DefenseIranDashboardAvance:
             "Navire logistique Bandar Abbas": {"type": "Navire soutien", "deplacement": 45000, "capacite": "Ravitaillement", "statut": "Opérationnel"}
         }
     
-    def generate_advanced_data(self, selection):
-        """Génère des données avancées et détaillées pour l'Iran"""
-        annees = list(range(2000, 2028))
-        
+    def define_event_timeline(self):
+        """Chronologie géopolitique : période, série affectée, effet (× ou +) et note d'impact des sanctions.
+        
+        Le retrait du JCPOA (2018) et la pression maximale (2020) restent sans effet sur le budget,
+        la levée partielle de 2015 s'appliquant déjà à toutes les années suivantes."""
+        fin = np.inf
+        evenements = [
+            # Événement, Début, Fin, Catégorie, Série, Effet, Valeur, Impact_Sanctions
+            ("Tensions nucléaires", 2006, 2008, "Tensions", 'Budget_Defense_Mds', '×', 1.10, None),
+            ("Préparation face aux menaces", 2006, fin, "Tensions", 'Readiness_Operative', '+', 5, None),
+            ("Résolution 1737", 2006, 2006, "Sanctions", None, None, None, 5),
+            ("Résolution 1929", 2010, 2010, "Sanctions", None, None, None, 7),
+            ("Sanctions renforcées", 2010, 2012, "Sanctions", 'Budget_Defense_Mds', '×', 0.90, None),
+            ("Expérience régionale", 2011, fin, "Conflits", 'Readiness_Operative', '+', 6, None),
+            ("Embargo pétrolier", 2012, 2012, "Sanctions", None, None, None, 8),
+            ("JCPOA Temporaire", 2015, fin, "Détente", 'Budget_Defense_Mds', '×', 1.15, 3),
+            ("Modernisation", 2015, fin, "Détente", 'Readiness_Operative', '+', 4, None),
+            ("Retrait US JCPOA", 2018, 2018, "Sanctions", None, None, None, 7),
+            ("Maximum Pressure", 2020, 2020, "Sanctions", None, None, None, 9),
+            ("Nouvelles sanctions", 2022, 2022, "Sanctions", None, None, None, 8)
+        ]
+        return pd.DataFrame(evenements, columns=['Événement', 'Début', 'Fin', 'Catégorie', 'Série',
+                                                 'Effet', 'Valeur', 'Impact_Sanctions'])
+    
+    def define_threat_catalog(self):
+        """Menaces (probabilité, impact, préparation, exposition par scénario) et capacités de réponse"""
+        menaces = pd.DataFrame({
+            'Type de Menace': ['Frappe Israélienne', 'Intervention US', 'Guerre Navale', 
+                             'Cyber Attaque', 'Soulèvement Interne', 'Blocus Économique'],
+            'Catégorie': ['Militaire', 'Militaire', 'Militaire', 'Cyber', 'Interne', 'Économique'],
+            'Probabilité': [0.6, 0.4, 0.5, 0.8, 0.3, 0.7],
+            'Impact': [0.8, 0.9, 0.7, 0.6, 0.8, 0.9],
+            'Niveau Préparation': [0.9, 0.7, 0.8, 0.6, 0.5, 0.8],
+            'Attaque Aérienne': [1.0, 0.8, 0.2, 0.0, 0.0, 0.0],
+            'Blocus Naval': [0.0, 0.6, 1.0, 0.0, 0.0, 0.8],
+            'Cyber Attaque': [0.2, 0.3, 0.0, 1.0, 0.3, 0.2],
+            'Opérations Spéciales': [0.3, 0.2, 0.2, 0.2, 1.0, 0.0],
+            'Guerre Régionale': [0.4, 1.0, 0.5, 0.0, 0.0, 0.3]
+        })
+        capacites = pd.DataFrame({
+            'Missiles': [0.9, 0.7, 0.2, 0.6, 0.8],
+            'Marine': [0.4, 0.9, 0.1, 0.3, 0.6],
+            'Proxies': [0.3, 0.2, 0.1, 0.8, 0.7],
+            'Cyber': [0.2, 0.1, 0.9, 0.4, 0.5]
+        }, index=pd.Index(SCENARIOS_REPONSE, name='Scénario'))
+        return menaces, capacites
+    
+    def read_threat_file(self, chemin):
+        """Catalogue de menaces au format CSV : une ligne par menace, expositions par scénario optionnelles.
+        
+        Renvoie les menaces et le nombre de lignes écartées pour une valeur numérique illisible."""
+        menaces = pd.read_csv(chemin)
+        if menaces.empty:
+            raise ValueError("catalogue vide")
+        manquantes = [colonne for colonne in ['Type de Menace', *COLONNES_MENACES] if colonne not in menaces.columns]
+        if manquantes:
+            raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+        
+        # Cellules vides : menace sans nom écartée, catégorie par défaut (codes de factorisation jamais négatifs)
+        menaces = menaces[menaces['Type de Menace'].astype(str).str.strip().ne('') & menaces['Type de Menace'].notna()]
+        if menaces.empty:
+            raise ValueError("aucune menace nommée")
+        menaces = menaces.copy()
+        if 'Catégorie' not in menaces.columns:
+            menaces['Catégorie'] = 'Non classée'
+        menaces['Catégorie'] = menaces['Catégorie'].fillna('Non classée').astype(str).str.strip().replace('', 'Non classée')
+        for scenario in SCENARIOS_REPONSE:
+            if scenario not in menaces.columns:
+                menaces[scenario] = 0.0
+        colonnes = COLONNES_MENACES + SCENARIOS_REPONSE
+        valeurs = menaces[colonnes].apply(pd.to_numeric, errors='coerce')
+        
+        # Cellule renseignée mais non numérique : la ligne est écartée plutôt que notée 0
+        illisibles = (valeurs.isna() & menaces[colonnes].notna()).any(axis=1)
+        if illisibles.all():
+            raise ValueError("aucune menace avec des valeurs numériques lisibles")
+        menaces[colonnes] = valeurs.fillna(0).clip(0, 1)
+        return menaces.loc[~illisibles, ['Type de Menace', 'Catégorie', *colonnes]], int(illisibles.sum())
+    
+    def score_threats(self, menaces, capacites):
+        """Scores vectorisés : risque = p × impact × (1 - préparation), écart = p × impact × (1 - couverture).
+        
+        La couverture d'une menace est la meilleure capacité de réponse, pondérée par son exposition aux scénarios."""
+        probabilite, impact, preparation = menaces[COLONNES_MENACES].to_numpy(dtype=float).T
+        exposition = menaces[SCENARIOS_REPONSE].to_numpy(dtype=float)
+        totaux = exposition.sum(axis=1, keepdims=True)
+        exposition = np.divide(exposition, totaux, out=np.full_like(exposition, 1 / len(SCENARIOS_REPONSE)),
+                               where=totaux > 0)
+        
+        couverture_capacites = exposition @ capacites.loc[SCENARIOS_REPONSE, CAPACITES_REPONSE].to_numpy(dtype=float)
+        couverture = couverture_capacites.max(axis=1)
+        gravite = probabilite * impact
+        
+        scores = menaces[['Type de Menace', 'Catégorie', *COLONNES_MENACES]].copy()
+        scores['Couverture'] = couverture
+        scores['Capacité Principale'] = np.asarray(CAPACITES_REPONSE)[couverture_capacites.argmax(axis=1)]
+        scores['Risque'] = gravite * (1 - preparation)
+        scores['Écart_Couverture'] = gravite * (1 - couverture)
+        return scores
+    
+    def rank_threats(self, scores, critere, k):
+        """Top-k par tri partiel : argpartition en O(n) puis tri des k retenus"""
+        valeurs = scores[critere].to_numpy()
+        k = min(k, len(valeurs))
+        retenus = np.argpartition(-valeurs, k - 1)[:k]
+        retenus = retenus[np.argsort(-valeurs[retenus], kind='stable')]
+        classement = scores.iloc[retenus].reset_index(drop=True)
+        classement.index = pd.RangeIndex(1, k + 1, name='Rang')
+        return classement
+    
+    def aggregate_threats(self, scores):
+        """Agrégats par catégorie en une passe (bincount pondéré)"""
+        codes, categories = pd.factorize(scores['Catégorie'], sort=True)
+        nombre = np.bincount(codes, minlength=len(categories))
+        return pd.DataFrame({
+            'Menaces': nombre,
+            'Risque_Total': np.bincount(codes, weights=scores['Risque'], minlength=len(categories)),
+            'Écart_Moyen': np.bincount(codes, weights=scores['Écart_Couverture'], minlength=len(categories)) / nombre
+        }, index=pd.Index(categories, name='Catégorie')).sort_values('Risque_Total', ascending=False)
+    
+    def count_points(self, fin, resolution):
+        """Nombre de pas de simulation entre 2000 et l'année de fin incluse"""
+        return int(np.floor((fin - ANNEE_DEBUT) / RESOLUTIONS[resolution] + 1e-9)) + 1
+    
+    def iter_advanced_data(self, selection, scenario="Statut Quo", fin=ANNEE_FIN,
+                           resolution="Annuelle", taille_chunk=TAILLE_CHUNK):
+        """Génère la simulation par blocs de taille fixe, en mémoire bornée quel que soit l'horizon"""
         config = self.get_advanced_config(selection)
+        pas = RESOLUTIONS[resolution]
+        total = self.count_points(fin, resolution)
         
+        for debut in range(0, total, taille_chunk):
+            indices = np.arange(debut, min(debut + taille_chunk, total))
+            if resolution == "Annuelle":
+                annees = ANNEE_DEBUT + indices
+            else:
+                annees = ANNEE_DEBUT + indices * pas
+            yield self.simulate_block(annees, config, scenario)
+    
+    def generate_advanced_data(self, selection, scenario="Statut Quo", fin=ANNEE_FIN, resolution="Annuelle"):
+        """Génère des données avancées et détaillées pour l'Iran (horizon complet en mémoire)"""
+        blocs = self.iter_advanced_data(selection, scenario, fin, resolution)
+        return pd.concat(blocs, ignore_index=True), self.get_advanced_config(selection)
+    
+    def simulate_block(self, annees, config, scenario):
+        """Simule toutes les séries sur un bloc d'années (vectorisé)"""
         data = {
             'Annee': annees,
             'Budget_Defense_Mds': self.simulate_advanced_budget(annees, config),
@@ -155,11 +1073,12 @@ class DefenseIranDashboardAvance:
             'Couverture_AD': self.simulate_air_defense_coverage(annees),
             'Resilience_Logistique': self.simulate_logistical_resilience(annees),
             'Cyber_Capabilities': self.simulate_cyber_capabilities(annees),
-            'Production_Armements': self.simulate_weapon_production(annees)
+            'Production_Armements': self.simulate_weapon_production(annees),
+            'Autosuffisance_Militaire': self.simulate_self_sufficiency(annees)
         }
         
         # Données spécifiques aux programmes
-        if 'missiles' in config.get('priorites', []):
+        if config.prio_missiles:
             data.update({
                 'Stock_Missiles': self.simulate_missile_arsenal_size(annees),
                 'Portee_Max_Missiles_Km': self.simulate_missile_range_evolution(annees),
@@ -167,32 +1086,381 @@ class DefenseIranDashboardAvance:
                 'Production_Missiles_An': self.simulate_missile_production(annees)
             })
         
-        if 'asymetrique' in config.get('priorites', []):
+        if config.prio_asymetrique:
             data.update({
                 'Forces_Proxies': self.simulate_proxy_forces(annees),
                 'Capacite_Navale_Asymetrique': self.simulate_asymmetric_naval(annees),
                 'Exercices_Guerre_Proximite': self.simulate_swarm_exercises(annees)
             })
         
-        if 'cyber' in config.get('priorites', []):
+        if config.prio_cyber:
             data.update({
                 'Attaques_Cyber_Reussies': self.simulate_cyber_attacks(annees),
                 'Reseau_Commandement_Cyber': self.simulate_cyber_command(annees),
                 'Cyber_Defense_Niveau': self.simulate_cyber_defense(annees)
             })
         
-        if 'nucleaire' in config.get('priorites', []):
+        if config.prio_nucleaire:
             data.update({
                 'Capacite_Enrichissement': self.simulate_enrichment_capacity(annees),
                 'Centrifuges_Operationnels': self.simulate_centrifuges(annees),
                 'Expertise_Nucleaire': self.simulate_nuclear_expertise(annees)
             })
         
-        return pd.DataFrame(data), config
+        data = self.chronologie.appliquer(data, annees)
+        return self.apply_scenario(pd.DataFrame(data), scenario)
     
-    def get_advanced_config(self, selection):
-        """Configuration avancée avec plus de détails pour l'Iran"""
-        configs = {
+    def scenario_factors(self, annees, scenario, colonnes):
+        """Colonnes affectées par le scénario et facteurs multiplicatifs (années × colonnes)"""
+        multiplicateurs = {colonne: facteur for colonne, facteur in SCENARIOS[scenario].items()
+                           if colonne in colonnes}
+        rampe = np.clip((np.asarray(annees, dtype=float) - ANNEE_BASCULE_SCENARIO) / DUREE_RAMPE_SCENARIO, 0, 1)
+        facteurs = 1 + np.outer(rampe, np.array(list(multiplicateurs.values())) - 1)
+        return list(multiplicateurs), facteurs
+    
+    def apply_scenario(self, bloc, scenario):
+        """Applique les multiplicateurs du scénario, en rampe à partir de l'année de bascule, puis les bornes"""
+        colonnes, facteurs = self.scenario_factors(bloc['Annee'], scenario, bloc.columns)
+        if colonnes:
+            bloc[colonnes] = bloc[colonnes].to_numpy() * facteurs
+        return apply_series_bounds(bloc)
+    
+    def compute_scenario_delta(self, df_base, scenario):
+        """Écart au scénario de référence, limité aux colonnes et années affectées"""
+        lignes = df_base['Annee'].to_numpy(dtype=float) > ANNEE_BASCULE_SCENARIO
+        colonnes, facteurs = self.scenario_factors(df_base['Annee'][lignes], scenario, df_base.columns)
+        base = df_base.loc[lignes, colonnes]
+        delta = apply_series_bounds(base * facteurs) - base
+        delta.insert(0, 'Annee', df_base.loc[lignes, 'Annee'])
+        return delta
+    
+    def apply_scenario_delta(self, df_base, resume_base, delta):
+        """Données et résumé du scénario reconstruits à partir de la référence complète et de l'écart"""
+        colonnes = [colonne for colonne in delta.columns if colonne != 'Annee']
+        df = df_base.copy()
+        df.loc[delta.index, colonnes] = df.loc[delta.index, colonnes].to_numpy() + delta[colonnes].to_numpy()
+        
+        resume = resume_base.copy()
+        resume.loc['Premier', colonnes] = df[colonnes].iloc[0]
+        resume.loc['Dernier', colonnes] = df[colonnes].iloc[-1]
+        resume.loc['Min', colonnes] = df[colonnes].min()
+        resume.loc['Max', colonnes] = df[colonnes].max()
+        resume.loc['Moyenne', colonnes] = df[colonnes].mean()
+        return df, resume
+    
+    def consume_stream(self, blocs, total, max_points=POINTS_GRAPHIQUES):
+        """Lit le flux une seule fois : échantillon régulier pour les graphiques et agrégats pour les métriques"""
+        pas = max(1, -(-total // max_points))
+        echantillons = []
+        premier = dernier = minimum = maximum = somme = None
+        position = 0
+        
+        for bloc in blocs:
+            indices = np.arange(position, position + len(bloc))
+            echantillons.append(bloc[(indices % pas == 0) | (indices == total - 1)])
+            
+            if premier is None:
+                premier = bloc.iloc[0]
+                minimum, maximum, somme = bloc.min(), bloc.max(), bloc.sum()
+            else:
+                minimum = np.minimum(minimum, bloc.min())
+                maximum = np.maximum(maximum, bloc.max())
+                somme = somme + bloc.sum()
+            dernier = bloc.iloc[-1]
+            position += len(bloc)
+        
+        resume = pd.DataFrame({
+            'Premier': premier, 'Dernier': dernier,
+            'Min': minimum, 'Max': maximum, 'Moyenne': somme / position
+        }).T
+        return pd.concat(echantillons, ignore_index=True), resume
+    
+    def compute_derived_analytics(self, df):
+        """Indicateurs dérivés de toutes les séries numériques, en une passe vectorisée"""
+        series = df.drop(columns='Annee').select_dtypes('number')
+        annees = df['Annee'].to_numpy(dtype=float)
+        duree = annees[-1] - annees[0]
+        points_par_an = max(1, int(round((len(df) - 1) / duree))) if duree > 0 else 1
+        fenetre = max(2, FENETRE_ANALYTIQUE_ANS * points_par_an)
+        
+        croissance = series.pct_change(periods=points_par_an) * 100
+        moyenne_mobile = series.rolling(fenetre, min_periods=1).mean()
+        volatilite = series.rolling(fenetre, min_periods=2).std()
+        zscores = (series - series.mean()) / series.std(ddof=0).replace(0, np.nan)
+        
+        premier, dernier = series.iloc[0], series.iloc[-1]
+        ratio = (dernier / premier.where(premier > 0)).where(dernier > 0)
+        synthese = pd.DataFrame({
+            'Dernier': dernier,
+            'Croissance_Totale_Pct': (ratio - 1) * 100,
+            'TCAC_Pct': (ratio ** (1 / duree) - 1) * 100 if duree > 0 else np.nan,
+            'Croissance_Annuelle_Moy_Pct': croissance.mean(),
+            'Volatilite_Moy': volatilite.mean(),
+            'ZScore_Dernier': zscores.iloc[-1]
+        })
+        
+        return {
+            'annees': df['Annee'],
+            'croissance_annuelle': croissance,
+            'moyenne_mobile': moyenne_mobile,
+            'volatilite': volatilite,
+            'zscores': zscores,
+            'correlations': series.corr(),
+            'synthese': synthese
+        }
+    
+    def fit_forecast_models(self, df):
+        """Ajuste une tendance sur toutes les séries en un seul appel de moindres carrés"""
+        series = df.drop(columns='Annee').select_dtypes('number')
+        annees = df['Annee'].to_numpy(dtype=float)
+        annee_ref = annees[-1]
+        fenetre = annees >= annee_ref - FENETRE_PREVISION_ANS
+        
+        X = np.column_stack([np.ones(fenetre.sum()), annees[fenetre] - annee_ref])
+        Y = series.to_numpy(dtype=float)[fenetre]
+        coefficients, _, _, _ = np.linalg.lstsq(X, Y, rcond=None)
+        
+        residus = Y - X @ coefficients
+        degres_liberte = max(len(X) - X.shape[1], 1)
+        return {
+            'colonnes': list(series.columns),
+            'coefficients': coefficients,
+            'sigma': np.sqrt((residus ** 2).sum(axis=0) / degres_liberte),
+            'xtx_inv': np.linalg.pinv(X.T @ X),
+            'annee_ref': annee_ref,
+            'dernieres_valeurs': series.iloc[-1].to_numpy(dtype=float)
+        }
+    
+    def evaluate_forecast(self, modeles, annees_prevision):
+        """Évalue les modèles ajustés sur l'horizon demandé (aucun réajustement)"""
+        annees = modeles['annee_ref'] + np.arange(1, annees_prevision + 1)
+        X = np.column_stack([np.ones(len(annees)), annees - modeles['annee_ref']])
+        prevision = X @ modeles['coefficients']
+        levier = np.einsum('ij,jk,ik->i', X, modeles['xtx_inv'], X)
+        marge = Z_CONFIANCE * np.sqrt(1 + levier)[:, None] * modeles['sigma'][None, :]
+        
+        def table(valeurs):
+            resultat = pd.DataFrame(valeurs, columns=modeles['colonnes'])
+            resultat.insert(0, 'Annee', annees)
+            return resultat
+        
+        return {
+            'prevision': table(prevision),
+            'basse': table(prevision - marge),
+            'haute': table(prevision + marge),
+            'depart': dict(zip(['Annee'] + modeles['colonnes'],
+                               [modeles['annee_ref'], *modeles['dernieres_valeurs']]))
+        }
+    
+    def add_forecast_traces(self, fig, prevision, colonne, nom, couleur, facteur=1, **options):
+        """Ajoute le segment prévu (pointillés) et sa bande de confiance à un graphique"""
+        if prevision is None or colonne not in prevision['prevision'].columns:
+            return
+        
+        annees = prevision['prevision']['Annee']
+        depart = prevision['depart']
+        fig.add_trace(go.Scatter(
+            x=pd.concat([annees, annees[::-1]]),
+            y=pd.concat([prevision['haute'][colonne], prevision['basse'][colonne][::-1]]) * facteur,
+            fill='toself', fillcolor=hex_to_rgba(couleur, 0.15), line=dict(width=0),
+            hoverinfo='skip', showlegend=False
+        ), **options)
+        fig.add_trace(go.Scatter(
+            x=[depart['Annee'], *annees],
+            y=np.concatenate([[depart[colonne]], prevision['prevision'][colonne]]) * facteur,
+            mode='lines', name=f"{nom} (prévision)",
+            line=dict(color=couleur, width=3, dash='dash'), showlegend=False,
+            hovertemplate=f"{nom} prévu: %{{y:.1f}}<extra></extra>"
+        ), **options)
+    
+    def add_reference_trace(self, fig, reference, df, colonne, nom, couleur, facteur=1, **options):
+        """Ajoute la courbe de référence (pointillés) d'une série modifiée par le scénario"""
+        if reference is None or colonne not in reference.columns:
+            return
+        if np.allclose(reference[colonne].to_numpy(), df[colonne].to_numpy()):
+            return
+        
+        fig.add_trace(go.Scatter(
+            x=reference['Annee'], y=reference[colonne] * facteur,
+            mode='lines', name=f"{nom} ({SCENARIO_REFERENCE})",
+            line=dict(color=couleur, width=2, dash='dot'), opacity=0.6,
+            hovertemplate=f"{nom} ({SCENARIO_REFERENCE}): %{{y:.1f}}<extra></extra>"
+        ), **options)
+    
+    def add_event_bands(self, fig, debut, fin):
+        """Bandes ombrées des périodes d'événements fusionnées et jalons des ruptures durables"""
+        for x0, x1, libelle in self.chronologie.bandes():
+            if x1 >= debut and x0 <= fin:
+                fig.add_vrect(x0=max(x0, debut), x1=min(x1, fin), fillcolor='#DA0000', opacity=0.08,
+                              line_width=0, layer='below', annotation_text=libelle,
+                              annotation_position='top left', annotation_font_size=10)
+        for annee, libelle in self.chronologie.jalons():
+            if debut <= annee <= fin:
+                fig.add_vline(x=annee, line_dash='dot', line_color='#636e72', annotation_text=libelle,
+                              annotation_position='bottom right', annotation_font_size=10)
+    
+    def write_stream_csv(self, blocs, fichier):
+        """Écrit le flux bloc par bloc dans un fichier texte (en-tête écrit une seule fois)"""
+        for i, bloc in enumerate(blocs):
+            bloc.to_csv(fichier, header=(i == 0), index=False)
+    
+    def write_stream_json(self, blocs, fichier):
+        """Écrit le flux sous forme d'un tableau JSON d'enregistrements, bloc par bloc"""
+        fichier.write(b'[')
+        premier = True
+        for bloc in blocs:
+            # Sous-blocs : le texte JSON d'un bloc complet pèse plusieurs fois ses valeurs
+            for debut in range(0, len(bloc), TAILLE_CHUNK_JSON):
+                corps = bloc.iloc[debut:debut + TAILLE_CHUNK_JSON].to_json(orient='records', force_ascii=False)[1:-1]
+                fichier.write((corps if premier else ',' + corps).encode('utf-8'))
+                premier = False
+        fichier.write(b']')
+    
+    def write_stream_parquet(self, blocs, chemin):
+        """Écrit le flux dans un fichier Parquet, un groupe de lignes par bloc"""
+        if not importlib.util.find_spec("pyarrow"):
+            import fastparquet
+            for i, bloc in enumerate(blocs):
+                fastparquet.write(chemin, bloc.reset_index(drop=True), append=i > 0)
+            return
+        
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        ecrivain = None
+        try:
+            for bloc in blocs:
+                table = pa.Table.from_pandas(bloc, preserve_index=False)
+                if ecrivain is None:
+                    ecrivain = pq.ParquetWriter(chemin, table.schema)
+                ecrivain.write_table(table)
+        finally:
+            if ecrivain is not None:
+                ecrivain.close()
+    
+    def write_view_export(self, chemin, selection, scenario, fin, resolution, format_export):
+        """Écrit la vue complète bloc par bloc dans un fichier temporaire, renommé une fois terminé"""
+        blocs = self.iter_advanced_data(selection, scenario, fin, resolution)
+        descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin))
+        try:
+            with os.fdopen(descripteur, 'wb') as fichier:
+                if format_export == "CSV":
+                    texte = io.TextIOWrapper(fichier, encoding='utf-8', newline='')
+                    self.write_stream_csv(blocs, texte)
+                    texte.flush()
+                    texte.detach()
+                elif format_export == "JSON":
+                    self.write_stream_json(blocs, fichier)
+            if format_export not in ("CSV", "JSON"):
+                self.write_stream_parquet(blocs, temporaire)
+            os.replace(temporaire, chemin)
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+        return chemin
+    
+    def serialize_frame(self, df, format_export):
+        """Sérialise une table dans le format demandé"""
+        if format_export == "CSV":
+            return df.to_csv(index=False).encode('utf-8')
+        if format_export == "JSON":
+            return df.to_json(orient='records', force_ascii=False).encode('utf-8')
+        tampon = io.BytesIO()
+        df.to_parquet(tampon, index=False)
+        return tampon.getvalue()
+    
+    def build_kpi_snapshot(self, resume, synthese):
+        """Instantané des KPI : agrégats du flux et indicateurs dérivés par série"""
+        return pd.concat([resume.T, synthese.drop(columns='Dernier')], axis=1).reset_index(names='Indicateur')
+    
+    def build_catalogs(self):
+        """Catalogues d'équipements sous forme de tables (missiles : catalogue normalisé, fichier compris)"""
+        return {
+            'catalogue_missiles': cached_call('catalogue', load_missile_catalog)['catalogue'],
+            'catalogue_naval': pd.DataFrame.from_dict(self.naval_assets, orient='index').reset_index(names='Système')
+        }
+    
+    def write_full_export(self, chemin, fin, resolution):
+        """Écrit l'archive zip de toutes les sélections × scénarios, entrée par entrée et bloc par bloc"""
+        with zipfile.ZipFile(chemin, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for selection in self.config_registry:
+                for scenario in SCENARIOS:
+                    nom = f"{slugify(selection)}/{slugify(scenario)}.csv"
+                    with archive.open(nom, 'w', force_zip64=True) as entree:
+                        with io.TextIOWrapper(entree, encoding='utf-8', newline='') as fichier:
+                            self.write_stream_csv(
+                                self.iter_advanced_data(selection, scenario, fin, resolution), fichier)
+            for nom, catalogue in self.build_catalogs().items():
+                archive.writestr(f"{nom}.csv", catalogue.to_csv(index=False))
+        return chemin
+    
+    def create_export_panel(self, df, resume, analytics, controls):
+        """Téléchargements de la vue courante et export complet en arrière-plan"""
+        with st.sidebar.expander("📥 EXPORT DES DONNÉES"):
+            format_export = st.radio("Format:", list(FORMATS_EXPORT), horizontal=True)
+            extension, mime = FORMATS_EXPORT[format_export]
+            
+            prefixe = slugify(f"{controls['selection']}_{controls['scenario']}")
+            vue = (controls['selection'], controls['scenario'], controls['fin_horizon'], controls['resolution'])
+            st.download_button(
+                "📊 Données de la vue",
+                data=lambda: open(cached_call('export', load_view_export, *vue, format_export), 'rb'),
+                file_name=f"{prefixe}_donnees_vue.{extension}",
+                mime=mime, on_click="ignore", key="export_donnees_vue"
+            )
+            
+            tables = {
+                'kpi': self.build_kpi_snapshot(resume, analytics['synthese']),
+                **self.build_catalogs()
+            }
+            libelles = {
+                'kpi': "🎯 Instantané KPI",
+                'catalogue_missiles': "🚀 Catalogue missiles",
+                'catalogue_naval': "🌊 Catalogue naval"
+            }
+            for nom, table in tables.items():
+                st.download_button(
+                    libelles[nom],
+                    data=cached_call('export', export_bytes, content_hash(table), format_export, table),
+                    file_name=f"{prefixe}_{nom}.{extension}" if nom == 'kpi' else f"{nom}.{extension}",
+                    mime=mime, on_click="ignore", key=f"export_{nom}"
+                )
+            points = self.count_points(controls['fin_horizon'], controls['resolution'])
+            if len(df) < points:
+                st.caption(f"Données de la vue : {points:,} points complets, générés au téléchargement")
+            
+            st.markdown("**📦 Export complet** (toutes sélections × scénarios, CSV zippé)")
+            exports = get_export_jobs()
+            cle = (controls['fin_horizon'], controls['resolution'])
+            with exports['verrou']:
+                tache = exports['taches'].get(cle)
+            
+            if tache is None:
+                if st.button("Préparer l'export complet", key="export_complet"):
+                    # Vérification et soumission atomiques : deux sessions simultanées ne lancent qu'un export
+                    with exports['verrou']:
+                        if cle not in exports['taches']:
+                            chemin = os.path.join(exports['dossier'], f"export_{cle[0]}_{slugify(cle[1])}.zip")
+                            exports['taches'][cle] = exports['executor'].submit(
+                                DefenseIranDashboardAvance().write_full_export, chemin, *cle)
+                    st.info("⏳ Export lancé en arrière-plan")
+            elif not tache.done():
+                st.info("⏳ Export en cours... relancez l'affichage pour le récupérer")
+            elif tache.exception() is not None:
+                st.error(f"Échec de l'export : {tache.exception()}")
+                with exports['verrou']:
+                    if exports['taches'].get(cle) is tache:
+                        exports['taches'].pop(cle)
+            else:
+                # Archive lue seulement au téléchargement, jamais à chaque exécution du script
+                chemin = tache.result()
+                st.download_button("⬇️ Télécharger l'archive", data=lambda: open(chemin, 'rb'),
+                                   file_name=os.path.basename(chemin),
+                                   mime="application/zip", on_click="ignore", key="export_archive")
+    
+    def define_advanced_configs(self):
+        """Configurations avancées de chaque branche, programme et vue scénarios"""
+        return {
             "Forces Armées de la RII": {
                 "type": "armee_totale",
                 "budget_base": 15.0,
@@ -202,6 +1470,30 @@ class DefenseIranDashboardAvance:
                 "doctrines": ["Dissuasion Asymétrique", "Guerre de Proximité", "Défense Stratégique"],
                 "capacites_speciales": ["Essaims de vedettes", "Missiles balistiques", "Guerre cyber"]
             },
+            "Armée de Terre": {
+                "type": "branche_terrestre",
+                "budget_base": 4.5,
+                "personnel_base": 350,
+                "exercices_base": 40,
+                "priorites": ["defense_territoriale", "artillerie", "drones", "asymetrique"],
+                "doctrines": ["Défense Mosaïque", "Défense en Profondeur"]
+            },
+            "Marine de la RII": {
+                "type": "branche_navale",
+                "budget_base": 1.8,
+                "personnel_base": 18,
+                "exercices_base": 25,
+                "priorites": ["sous_marins", "missiles_anti_navires", "defense_cotiere"],
+                "zones": ["Golfe Persique", "Mer d'Oman", "Océan Indien"]
+            },
+            "Force Aérienne": {
+                "type": "branche_aerienne",
+                "budget_base": 2.5,
+                "personnel_base": 37,
+                "exercices_base": 20,
+                "priorites": ["defense_aerienne", "drones", "missiles_croisiere"],
+                "capacites": ["Chasseurs modernisés", "Drones de reconnaissance", "Frappes de précision"]
+            },
             "Forces de la Révolution Islamique (IRGC)": {
                 "type": "branche_elite",
                 "personnel_base": 125,
@@ -210,6 +1502,30 @@ class DefenseIranDashboardAvance:
                 "unites_speciales": ["Forces Quds", "Basij", "Forces Navales IRGC"],
                 "zones_operations": ["Moyen-Orient", "Golfe Persique", "Mer d'Oman"]
             },
+            "Forces Quds": {
+                "type": "unite_speciale",
+                "budget_base": 0.9,
+                "personnel_base": 15,
+                "exercices_base": 10,
+                "priorites": ["proxies", "operations_speciales", "renseignement"],
+                "zones_operations": ["Liban", "Syrie", "Irak", "Yémen"]
+            },
+            "Basij": {
+                "type": "force_paramilitaire",
+                "budget_base": 0.6,
+                "personnel_base": 90,
+                "exercices_base": 30,
+                "priorites": ["defense_territoriale", "asymetrique", "cyber"],
+                "capacites": ["Mobilisation populaire", "Sécurité intérieure", "Cyber-milices"]
+            },
+            "Garde Côtière": {
+                "type": "branche_cotiere",
+                "budget_base": 0.4,
+                "personnel_base": 8,
+                "exercices_base": 12,
+                "priorites": ["vedettes_rapides", "defense_cotiere"],
+                "zones": ["Détroit d'Ormuz", "Côtes du Golfe Persique"]
+            },
             "Programme Missilistique": {
                 "type": "programme_strategique",
                 "budget_base": 3.5,
@@ -217,198 +1533,330 @@ class DefenseIranDashboardAvance:
                 "systemes_deployes": ["Shahab-3", "Ghadr", "Emad", "Fateh-110"],
                 "objectifs": "Couverture régionale complète"
             },
+            "Défense Aérienne": {
+                "type": "programme_defensif",
+                "budget_base": 1.5,
+                "personnel_base": 15,
+                "exercices_base": 15,
+                "priorites": ["defense_aerienne", "reseau_radar", "guerre_electronique"],
+                "systemes_deployes": ["Bavar-373", "Khordad-3", "S-300PMU2"]
+            },
             "Capacités Navales Asymétriques": {
                 "type": "programme_asymetrique",
                 "budget_base": 1.2,
                 "priorites": ["sous_marins", "vedettes_rapides", "mines_marines", "missiles_anti_navires"],
                 "capacites": ["Essaims navals", "Guerre des détroits", "Déni d'accès"],
                 "zones": ["Détroit d'Ormuz", "Golfe Persique"]
+            },
+            "Guerre de Proximité": {
+                "type": "programme_asymetrique",
+                "budget_base": 1.0,
+                "personnel_base": 40,
+                "exercices_base": 20,
+                "priorites": ["proxies", "operations_speciales", "missiles_courte_portee"],
+                "capacites": ["Forces proxy", "Roquettes tactiques", "Guérilla"]
+            },
+            "Cybersécurité": {
+                "type": "programme_cyber",
+                "budget_base": 0.5,
+                "personnel_base": 5,
+                "exercices_base": 10,
+                "priorites": ["cyber", "guerre_electronique", "renseignement"],
+                "capacites": ["Cyber-offensive", "Protection des infrastructures", "Guerre électronique"]
+            },
+            "Drones de Combat": {
+                "type": "programme_strategique",
+                "budget_base": 0.8,
+                "personnel_base": 6,
+                "exercices_base": 12,
+                "priorites": ["drones", "missiles_croisiere", "precision"],
+                "systemes_deployes": ["Shahed-129", "Shahed-136", "Mohajer-6"]
+            },
+            "Programme Nucléaire": {
+                "type": "programme_strategique",
+                "budget_base": 2.0,
+                "personnel_base": 20,
+                "exercices_base": 5,
+                "priorites": ["nucleaire", "missiles_balistiques"],
+                "sites": ["Natanz", "Fordow", "Bushehr", "Arak"]
+            },
+            "Scénarios Géopolitiques": {
+                "type": "vue_scenarios",
+                "budget_base": 15.0,
+                "personnel_base": 610,
+                "exercices_base": 80,
+                "priorites": ["missiles", "asymetrique", "cyber", "nucleaire"],
+                "scenarios": ["Statut Quo", "Tensions Régionales", "Sanctions Renforcées", "Conflit Ouvert"]
             }
         }
-        
-        return configs.get(selection, {
-            "type": "branche",
-            "personnel_base": 50,
-            "exercices_base": 20,
-            "priorites": ["defense_generique"]
-        })
+    
+    def get_advanced_config(self, selection):
+        """Configuration figée de la sélection (recherche directe dans le registre)"""
+        return self.config_registry[selection]
     
     def simulate_advanced_budget(self, annees, config):
-        """Simulation avancée du budget avec variations géopolitiques"""
-        budget_base = config.get('budget_base', 12.0)
-        budgets = []
-        for annee in annees:
-            base = budget_base * (1 + 0.045 * (annee - 2000))
-            # Variations selon événements géopolitiques
-            if 2006 <= annee <= 2008:  # Tensions nucléaires
-                base *= 1.1
-            elif 2010 <= annee <= 2012:  # Sanctions renforcées
-                base *= 0.9
-            elif annee >= 2015:  # Levée partielle des sanctions
-                base *= 1.15
-            elif annee >= 2018:  # Retrait américain JCPOA
-                base *= 1.1
-            elif annee >= 2020:  # Tensions régionales
-                base *= 1.2
-            budgets.append(base)
-        return budgets
+        """Tendance du budget (variations géopolitiques appliquées par la chronologie)"""
+        a = np.asarray(annees, dtype=float)
+        return config.budget_base * (1 + 0.045 * (a - 2000))
     
     def simulate_advanced_personnel(self, annees, config):
         """Simulation avancée des effectifs"""
-        personnel_base = config.get('personnel_base', 500)
-        return [personnel_base * (1 + 0.012 * (annee - 2000)) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return config.personnel_base * (1 + 0.012 * (a - 2000))
     
     def simulate_military_gdp_percentage(self, annees):
         """Pourcentage du PIB consacré à la défense"""
-        return [3.2 + 0.15 * (annee - 2000) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return 3.2 + 0.15 * (a - 2000)
     
     def simulate_advanced_exercises(self, annees, config):
         """Exercices militaires avec saisonnalité"""
-        base = config.get('exercices_base', 60)
-        return [base + 4 * (annee - 2000) + 6 * np.sin(2 * np.pi * (annee - 2000)/4) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return config.exercices_base + 4 * (a - 2000) + 6 * np.sin(2 * np.pi * (a - 2000) / 4)
     
     def simulate_advanced_readiness(self, annees):
-        """Préparation opérationnelle avancée"""
-        readiness = []
-        for annee in annees:
-            base = 70 + 1.3 * (annee - 2000)
-            if annee >= 2006:  # Préparation face aux menaces
-                base += 5
-            if annee >= 2011:  # Expérience régionale
-                base += 6
-            if annee >= 2015:  # Modernisation
-                base += 4
-            readiness.append(min(base, 92))
-        return readiness
+        """Tendance de la préparation opérationnelle (paliers et plafond appliqués par la chronologie)"""
+        a = np.asarray(annees, dtype=float)
+        return 70 + 1.3 * (a - 2000)
     
     def simulate_advanced_deterrence(self, annees):
         """Capacité de dissuasion avancée"""
-        deterrence = []
-        for annee in annees:
-            if annee < 2000:
-                base = 40  # Capacités conventionnelles
-            elif annee < 2008:
-                base = 55  # Développement missiles
-            elif annee < 2015:
-                base = 70  # Capacités régionales
-            else:
-                base = 80 + 1.5 * (annee - 2015)  # Dissuasion avancée
-            deterrence.append(min(base, 95))
-        return deterrence
+        a = np.asarray(annees, dtype=float)
+        base = np.select(
+            [a < 2000,   # Capacités conventionnelles
+             a < 2008,   # Développement missiles
+             a < 2015],  # Capacités régionales
+            [40, 55, 70],
+            default=80 + 1.5 * (a - 2015)  # Dissuasion avancée
+        )
+        return np.minimum(base, 95)
     
     def simulate_advanced_mobilization(self, annees):
         """Temps de mobilisation avancé"""
-        return [max(30 - 0.8 * (annee - 2000), 7) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.maximum(30 - 0.8 * (a - 2000), 7)
     
     def simulate_missile_tests(self, annees):
         """Tests de missiles"""
-        tests = []
-        for annee in annees:
-            if annee < 2005:
-                tests.append(2)
-            elif annee < 2010:
-                tests.append(5 + (annee - 2005))
-            elif annee < 2015:
-                tests.append(10 + 2 * (annee - 2010))
-            else:
-                tests.append(20 + 3 * (annee - 2015))
-        return tests
+        a = np.asarray(annees, dtype=float)
+        return np.select(
+            [a < 2005, a < 2010, a < 2015],
+            [2, 5 + (a - 2005), 10 + 2 * (a - 2010)],
+            default=20 + 3 * (a - 2015)
+        )
     
     def simulate_tech_development(self, annees):
         """Développement technologique global"""
-        return [min(45 + 2.8 * (annee - 2000), 85) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(45 + 2.8 * (a - 2000), 85)
     
     def simulate_artillery_capacity(self, annees):
         """Capacité d'artillerie"""
-        return [min(75 + 1.5 * (annee - 2000), 92) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(75 + 1.5 * (a - 2000), 92)
     
     def simulate_air_defense_coverage(self, annees):
         """Couverture de défense anti-aérienne"""
-        return [min(50 + 2.5 * (annee - 2000), 88) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(50 + 2.5 * (a - 2000), 88)
     
     def simulate_logistical_resilience(self, annees):
         """Résilience logistique"""
-        return [min(65 + 2.2 * (annee - 2000), 90) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(65 + 2.2 * (a - 2000), 90)
     
     def simulate_cyber_capabilities(self, annees):
         """Capacités cybernétiques"""
-        return [min(55 + 3.2 * (annee - 2000), 87) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(55 + 3.2 * (a - 2000), 87)
     
     def simulate_weapon_production(self, annees):
         """Production d'armements (indice)"""
-        return [min(60 + 2.5 * (annee - 2000), 89) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(60 + 2.5 * (a - 2000), 89)
+    
+    def simulate_self_sufficiency(self, annees):
+        """Autosuffisance militaire (résilience face aux sanctions)"""
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(40 + 3 * (a - 2000), 85)
     
     def simulate_missile_arsenal_size(self, annees):
         """Évolution du stock de missiles"""
-        stock = []
-        for annee in annees:
-            if annee < 2000:
-                stock.append(100)
-            elif annee < 2008:
-                stock.append(200 + 30 * (annee - 2000))
-            elif annee < 2015:
-                stock.append(500 + 50 * (annee - 2008))
-            else:
-                stock.append(1000 + 80 * (annee - 2015))
-        return [min(s, 3000) for s in stock]
+        a = np.asarray(annees, dtype=float)
+        stock = np.select(
+            [a < 2000, a < 2008, a < 2015],
+            [100, 200 + 30 * (a - 2000), 500 + 50 * (a - 2008)],
+            default=1000 + 80 * (a - 2015)
+        )
+        return np.minimum(stock, 3000)
     
     def simulate_missile_range_evolution(self, annees):
         """Évolution de la portée maximale des missiles"""
-        portee = []
-        for annee in annees:
-            if annee < 2000:
-                portee.append(300)  # Scud
-            elif annee < 2006:
-                portee.append(500 + 100 * (annee - 2000))  # Shahab-1/2
-            elif annee < 2012:
-                portee.append(1300 + 150 * (annee - 2006))  # Shahab-3
-            else:
-                portee.append(2000)  # Missiles à moyenne portée
-        return portee
+        a = np.asarray(annees, dtype=float)
+        return np.select(
+            [a < 2000,   # Scud
+             a < 2006,   # Shahab-1/2
+             a < 2012],  # Shahab-3
+            [300, 500 + 100 * (a - 2000), 1300 + 150 * (a - 2006)],
+            default=2000  # Missiles à moyenne portée
+        )
     
     def simulate_missile_accuracy(self, annees):
         """Amélioration de la précision des missiles"""
-        return [max(1000 - 40 * (annee - 2000), 50) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.maximum(1000 - 40 * (a - 2000), 50)
     
     def simulate_missile_production(self, annees):
         """Production annuelle de missiles"""
-        return [min(50 + 10 * (annee - 2000), 200) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(50 + 10 * (a - 2000), 200)
     
     def simulate_proxy_forces(self, annees):
         """Forces proxy soutenues"""
-        return [min(5 + 2 * (annee - 2000), 50) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(5 + 2 * (a - 2000), 50)
     
     def simulate_asymmetric_naval(self, annees):
         """Capacités navales asymétriques"""
-        return [min(40 + 3 * (annee - 2000), 85) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(40 + 3 * (a - 2000), 85)
     
     def simulate_swarm_exercises(self, annees):
         """Exercices de guerre d'essaims"""
-        return [min(10 + 2 * (annee - 2000), 60) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(10 + 2 * (a - 2000), 60)
     
     def simulate_enrichment_capacity(self, annees):
         """Capacité d'enrichissement d'uranium"""
-        return [min(5 + 3 * (annee - 2000), 40) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(5 + 3 * (a - 2000), 40)
     
     def simulate_centrifuges(self, annees):
         """Centrifuges opérationnels (milliers)"""
-        return [min(1 + 0.5 * (annee - 2000), 20) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(1 + 0.5 * (a - 2000), 20)
     
     def simulate_nuclear_expertise(self, annees):
         """Expertise nucléaire"""
-        return [min(30 + 4 * (annee - 2000), 85) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(30 + 4 * (a - 2000), 85)
     
     def simulate_cyber_attacks(self, annees):
         """Attaques cyber réussies (estimation)"""
-        return [min(15 + 3 * (annee - 2000), 80) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(15 + 3 * (a - 2000), 80)
     
     def simulate_cyber_command(self, annees):
         """Réseau de commandement cyber"""
-        return [min(50 + 3 * (annee - 2000), 88) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(50 + 3 * (a - 2000), 88)
     
     def simulate_cyber_defense(self, annees):
         """Capacités de cyber défense"""
-        return [min(45 + 3.2 * (annee - 2000), 86) for annee in annees]
+        a = np.asarray(annees, dtype=float)
+        return np.minimum(45 + 3.2 * (a - 2000), 86)
+    
+    def reserve_figure(self, builder, *args, cle=None):
+        """Réserve l'emplacement d'un graphique et lance sa construction dans le pool.
+        
+        Avec une clé de vue, le graphique est partagé entre sessions via le cache de figures."""
+        placeholder = st.empty()
+        placeholder.caption("⏳ Construction du graphique...")
+        future = get_figure_executor().submit(self.build_timed, get_operational_metrics(), builder, *args, cle=cle)
+        self.figures_en_attente.append((placeholder, future, self.onglet_courant, time.perf_counter()))
+        return placeholder
+    
+    def build_timed(self, metriques, builder, *args, cle=None):
+        """Construit et sérialise un graphique en mesurant sa durée"""
+        if cle is not None:
+            return cached_call('figure', load_figure, builder.__name__, cle, builder, args)
+        with metriques.mesurer('dashboard_figure_build_seconds', figure=builder.__name__):
+            return serialize_figure(builder(*args))
+    
+    def warm_static_caches(self):
+        """Graphiques indépendants de la vue et catalogue des missiles"""
+        cached_call('catalogue', load_missile_catalog)
+        for builder in (self.build_sanctions_figure, self.build_weapon_systems_figure, self.build_modernization_figure):
+            cached_call('figure', load_figure, builder.__name__, (), builder, ())
+        
+        catalogue = cached_call('menaces', load_threat_catalog)
+        for builder, args in ((self.build_threat_matrix_figure, (catalogue['scores'],)),
+                              (self.build_response_capabilities_figure, (catalogue['capacites'],))):
+            cached_call('figure', load_figure, builder.__name__, (catalogue['empreinte'],), builder, args)
+    
+    def warm_view(self, selection, scenario, fin=ANNEE_FIN, resolution="Annuelle",
+                  annees_prevision=ANNEES_PREVISION_DEFAUT):
+        """Remplit les caches de données, d'indicateurs et de graphiques d'une vue aux réglages par défaut"""
+        vue = (selection, scenario, fin, resolution)
+        df, _ = cached_call('simulation', load_simulation, *vue)
+        analytics = cached_call('analytique', load_analytics, *vue)
+        prevision = self.evaluate_forecast(cached_call('prevision', load_forecast_models, *vue), annees_prevision)
+        
+        cle = (*vue, annees_prevision, False)
+        serie = analytics['synthese'].index[0]
+        figures = [
+            (self.build_capabilities_figure, (df, prevision, None), cle),
+            (self.build_strategic_programmes_figure, (df, prevision, None), cle),
+            (self.build_self_sufficiency_figure, (df,), cle),
+            (self.build_correlation_heatmap, (analytics['correlations'],), cle),
+            (self.build_rolling_figure, (analytics, serie), (*cle, serie)),
+            (self.build_growth_figure, (analytics, serie), (*cle, serie))
+        ]
+        for builder, args, cle_figure in figures:
+            cached_call('figure', load_figure, builder.__name__, cle_figure, builder, args)
+    
+    def display_warmup_status(self, prechauffage):
+        """Avancement du préchauffage des caches"""
+        with st.sidebar.expander("🔥 Préchauffage des caches"):
+            if prechauffage.mode == 'off':
+                st.caption("Désactivé (DASHBOARD_WARMUP=off)")
+                return
+            
+            total = len(prechauffage.vues)
+            st.progress(prechauffage.faites / total if total else 1.0,
+                        text=f"{prechauffage.faites}/{total} vues (mode {prechauffage.mode})")
+            if prechauffage.en_cours:
+                ecoule = time.perf_counter() - prechauffage.debut
+                st.caption(f"En cours : {prechauffage.en_cours} — {ecoule:.1f} s écoulées")
+            elif prechauffage.duree is not None:
+                st.caption(f"Terminé en {prechauffage.duree:.1f} s "
+                           f"({prechauffage.duree / max(total, 1) * 1000:.0f} ms par vue)")
+            for erreur in prechauffage.erreurs[:3]:
+                st.warning(erreur)
+    
+    def flush_figures(self):
+        """Remplit chaque emplacement réservé dès que son graphique est prêt ; attente mesurée par onglet"""
+        en_attente = {future: (placeholder, onglet, reserve) for placeholder, future, onglet, reserve in self.figures_en_attente}
+        self.figures_en_attente = []
+        attentes = {}
+        
+        for future in as_completed(en_attente):
+            placeholder, onglet, reserve = en_attente[future]
+            try:
+                fig = future.result()
+            except Exception as exc:
+                placeholder.error(f"Erreur lors de la construction du graphique : {exc}")
+            else:
+                if fig is None:
+                    placeholder.empty()
+                else:
+                    placeholder.plotly_chart(fig, use_container_width=True)
+            if onglet is not None:
+                attentes[onglet] = max(attentes.get(onglet, 0.0), time.perf_counter() - reserve)
+        
+        metriques = get_operational_metrics()
+        for onglet, attente in attentes.items():
+            metriques.observer('dashboard_tab_figures_seconds', attente, tab=onglet)
+    
+    @contextmanager
+    def render_tab(self, metriques, onglet):
+        """Rendu d'un onglet chronométré ; les graphiques réservés pendant ce rendu lui sont rattachés"""
+        self.onglet_courant = onglet
+        try:
+            with metriques.mesurer('dashboard_tab_render_seconds', tab=onglet):
+                yield
+        finally:
+            self.onglet_courant = None
     
     def display_advanced_header(self):
         """En-tête avancé avec plus d'informations"""
@@ -425,20 +1873,76 @@ class DefenseIranDashboardAvance:
             </div>
             """, unsafe_allow_html=True)
     
+    def define_permalink_fields(self):
+        """Champs du permalien : paramètre d'URL → (clé du widget, valeurs admises, valeur par défaut)"""
+        return {
+            'mode': ('type_analyse', MODES_ANALYSE, MODES_ANALYSE[0]),
+            'branche': ('branche', self.branches_options, self.branches_options[0]),
+            'programme': ('programme', self.programmes_options, self.programmes_options[0]),
+            'scenario': ('scenario', list(SCENARIOS), SCENARIO_REFERENCE),
+            'fin': ('fin_horizon', range(ANNEE_FIN, ANNEE_FIN_MAX + 1), ANNEE_FIN),
+            'resolution': ('resolution', list(RESOLUTIONS), "Annuelle"),
+            'prevision': ('annees_prevision', range(0, 21), ANNEES_PREVISION_DEFAUT),
+            'comparer': ('comparer', (False, True), False),
+            'geopolitique': ('show_geopolitical', (False, True), True),
+            'doctrine': ('show_doctrinal', (False, True), True),
+            'technique': ('show_technical', (False, True), True),
+            'menaces': ('threat_assessment', (False, True), True)
+        }
+    
+    def encode_permalink_value(self, valeur):
+        """Valeur de widget → texte court pour l'URL"""
+        if isinstance(valeur, bool):
+            return str(int(valeur))
+        return slugify(valeur) if isinstance(valeur, str) else str(valeur)
+    
+    def restore_permalink(self):
+        """Initialise l'état des widgets : paramètres d'URL à la première exécution, défauts ensuite"""
+        premiere_execution = 'permalien_restaure' not in st.session_state
+        st.session_state['permalien_restaure'] = True
+        
+        for parametre, (cle, valeurs, defaut) in self.define_permalink_fields().items():
+            if premiere_execution and parametre in st.query_params:
+                admises = {self.encode_permalink_value(valeur): valeur for valeur in valeurs}
+                st.session_state[cle] = admises.get(st.query_params[parametre], defaut)
+            st.session_state.setdefault(cle, defaut)  # Widget masqué au rerun précédent
+    
+    def build_permalink(self, controls):
+        """Paramètres canoniques de la vue : uniquement les valeurs utiles différentes du défaut"""
+        ignores = {
+            'branche': controls['type_analyse'] != MODES_ANALYSE[0],
+            'programme': controls['type_analyse'] != MODES_ANALYSE[1],
+            'comparer': controls['scenario'] == SCENARIO_REFERENCE
+        }
+        return {
+            parametre: self.encode_permalink_value(st.session_state[cle])
+            for parametre, (cle, _, defaut) in self.define_permalink_fields().items()
+            if not ignores.get(parametre) and st.session_state[cle] != defaut
+        }
+    
+    def display_permalink(self, controls):
+        """Réécrit l'URL avec l'état courant et affiche le lien à partager"""
+        parametres = self.build_permalink(controls)
+        if parametres != st.query_params.to_dict():
+            st.query_params.from_dict(parametres)
+        
+        base = (st.context.url or "").split('?')[0]
+        with st.sidebar.expander("🔗 Permalien de la vue"):
+            st.code(f"{base}?{urlencode(parametres)}" if parametres else base or "?", language=None)
+            st.caption("Ouvre directement cette vue, servie depuis les caches partagés")
+    
     def create_advanced_sidebar(self):
         """Sidebar avancé avec plus d'options"""
         st.sidebar.markdown("## 🎛️ PANEL DE CONTRÔLE AVANCÉ")
+        self.restore_permalink()
         
         # Sélection du type d'analyse
-        type_analyse = st.sidebar.radio(
-            "Mode d'analyse:",
-            ["Analyse Branche Militaire", "Programmes Stratégiques", "Vue Systémique", "Scénarios Géopolitiques"]
-        )
+        type_analyse = st.sidebar.radio("Mode d'analyse:", MODES_ANALYSE, key='type_analyse')
         
         if type_analyse == "Analyse Branche Militaire":
-            selection = st.sidebar.selectbox("Branche militaire:", self.branches_options)
+            selection = st.sidebar.selectbox("Branche militaire:", self.branches_options, key='branche')
         elif type_analyse == "Programmes Stratégiques":
-            selection = st.sidebar.selectbox("Programme stratégique:", self.programmes_options)
+            selection = st.sidebar.selectbox("Programme stratégique:", self.programmes_options, key='programme')
         elif type_analyse == "Vue Systémique":
             selection = "Forces Armées de la RII"
         else:
@@ -446,14 +1950,19 @@ class DefenseIranDashboardAvance:
         
         # Options avancées
         st.sidebar.markdown("### 🔧 OPTIONS AVANCÉES")
-        show_geopolitical = st.sidebar.checkbox("Contexte géopolitique", value=True)
-        show_doctrinal = st.sidebar.checkbox("Analyse doctrinale", value=True)
-        show_technical = st.sidebar.checkbox("Détails techniques", value=True)
-        threat_assessment = st.sidebar.checkbox("Évaluation des menaces", value=True)
+        show_geopolitical = st.sidebar.checkbox("Contexte géopolitique", key='show_geopolitical')
+        show_doctrinal = st.sidebar.checkbox("Analyse doctrinale", key='show_doctrinal')
+        show_technical = st.sidebar.checkbox("Détails techniques", key='show_technical')
+        threat_assessment = st.sidebar.checkbox("Évaluation des menaces", key='threat_assessment')
         
         # Paramètres de simulation
         st.sidebar.markdown("### ⚙️ PARAMÈTRES DE SIMULATION")
-        scenario = st.sidebar.selectbox("Scénario:", ["Statut Quo", "Tensions Régionales", "Sanctions Renforcées", "Conflit Ouvert"])
+        scenario = st.sidebar.selectbox("Scénario:", list(SCENARIOS), key='scenario')
+        fin_horizon = st.sidebar.slider("Fin de l'horizon:", ANNEE_FIN, ANNEE_FIN_MAX, key='fin_horizon')
+        resolution = st.sidebar.selectbox("Résolution temporelle:", list(RESOLUTIONS), key='resolution')
+        annees_prevision = st.sidebar.slider("Années de prévision:", 0, 20, key='annees_prevision')
+        comparer = st.sidebar.checkbox(f"Comparer au « {SCENARIO_REFERENCE} »", key='comparer',
+                                       disabled=(scenario == SCENARIO_REFERENCE))
         
         return {
             'selection': selection,
@@ -462,17 +1971,26 @@ class DefenseIranDashboardAvance:
             'show_doctrinal': show_doctrinal,
             'show_technical': show_technical,
             'threat_assessment': threat_assessment,
-            'scenario': scenario
+            'scenario': scenario,
+            'fin_horizon': fin_horizon,
+            'resolution': resolution,
+            'annees_prevision': annees_prevision,
+            'comparer': comparer and scenario != SCENARIO_REFERENCE
         }
     
-    def display_strategic_metrics(self, df, config):
-        """Métriques stratégiques avancées"""
+    def display_strategic_metrics(self, resume, config, synthese, resume_base=None):
+        """Métriques stratégiques avancées (agrégats lus sur le flux de simulation), écart à la référence en comparaison"""
         st.markdown('<h3 class="section-header">🎯 TABLEAU DE BORD STRATÉGIQUE</h3>', 
                    unsafe_allow_html=True)
         
-        derniere_annee = df['Annee'].max()
-        data_actuelle = df[df['Annee'] == derniere_annee].iloc[0]
-        data_2000 = df[df['Annee'] == 2000].iloc[0]
+        data_actuelle = resume.loc['Dernier']
+        data_2000 = resume.loc['Premier']
+        croissance = synthese['Croissance_Totale_Pct']
+        ecarts = self.compute_kpi_deltas(resume, resume_base)['Écart_Pct'] if resume_base is not None else pd.Series(dtype=float)
+        ligne_ecart = lambda colonne: (f"<p>⚖️ {ecarts[colonne]:+.1f}% vs {SCENARIO_REFERENCE}</p>"
+                                       if colonne in ecarts.index and pd.notna(ecarts[colonne]) else "")
+        delta_metrique = lambda colonne, defaut: (f"{ecarts[colonne]:+.1f}% vs {SCENARIO_REFERENCE}"
+                                                  if colonne in ecarts.index and pd.notna(ecarts[colonne]) else defaut)
         
         # Première ligne de métriques
         col1, col2, col3, col4 = st.columns(4)
@@ -480,11 +1998,12 @@ class DefenseIranDashboardAvance:
         with col1:
             st.markdown("""
             <div class="metric-card">
-                <h4>💰 BUDGET DÉFENSE 2027</h4>
+                <h4>💰 BUDGET DÉFENSE {:.0f}</h4>
                 <h2>{:.1f} Md$</h2>
-                <p>📈 {:.1f}% du PIB</p>
+                <p>📈 {:.1f}% du PIB</p>{}
             </div>
-            """.format(data_actuelle['Budget_Defense_Mds'], data_actuelle['PIB_Militaire_Pourcent']), 
+            """.format(data_actuelle['Annee'], data_actuelle['Budget_Defense_Mds'], data_actuelle['PIB_Militaire_Pourcent'],
+                       ligne_ecart('Budget_Defense_Mds')), 
             unsafe_allow_html=True)
         
         with col2:
@@ -492,10 +2011,10 @@ class DefenseIranDashboardAvance:
             <div class="metric-card">
                 <h4>👥 EFFECTIFS TOTAUX</h4>
                 <h2>{:,.0f}K</h2>
-                <p>⚔️ +{:.1f}% depuis 2000</p>
+                <p>⚔️ +{:.1f}% depuis 2000</p>{}
             </div>
-            """.format(data_actuelle['Personnel_Milliers'], 
-                     ((data_actuelle['Personnel_Milliers'] - data_2000['Personnel_Milliers']) / data_2000['Personnel_Milliers']) * 100), 
+            """.format(data_actuelle['Personnel_Milliers'], croissance['Personnel_Milliers'],
+                       ligne_ecart('Personnel_Milliers')), 
             unsafe_allow_html=True)
         
         with col3:
@@ -503,10 +2022,10 @@ class DefenseIranDashboardAvance:
             <div class="missile-card">
                 <h4>🚀 ARSENAL MISSILISTIQUE</h4>
                 <h2>{:.0f}%</h2>
-                <p>🎯 {} missiles stratégiques</p>
+                <p>🎯 {} missiles stratégiques</p>{}
             </div>
             """.format(data_actuelle['Capacite_Dissuasion'], 
-                     int(data_actuelle.get('Stock_Missiles', 0))), 
+                     int(data_actuelle.get('Stock_Missiles', 0)), ligne_ecart('Capacite_Dissuasion')), 
             unsafe_allow_html=True)
         
         with col4:
@@ -514,51 +2033,108 @@ class DefenseIranDashboardAvance:
             <div class="asymmetric-card">
                 <h4>🌊 CAPACITÉS ASYMÉTRIQUES</h4>
                 <h2>{:.0f}%</h2>
-                <p>⚡ {} groupes proxy</p>
+                <p>⚡ {} groupes proxy</p>{}
             </div>
             """.format(data_actuelle.get('Capacite_Navale_Asymetrique', 0), 
-                     int(data_actuelle.get('Forces_Proxies', 0))), 
+                     int(data_actuelle.get('Forces_Proxies', 0)), ligne_ecart('Capacite_Navale_Asymetrique')), 
             unsafe_allow_html=True)
         
         # Deuxième ligne de métriques
         col5, col6, col7, col8 = st.columns(4)
         
         with col5:
-            reduction_temps = ((data_2000['Temps_Mobilisation_Jours'] - data_actuelle['Temps_Mobilisation_Jours']) / 
-                             data_2000['Temps_Mobilisation_Jours']) * 100
+            reduction_temps = -croissance['Temps_Mobilisation_Jours']
             st.metric(
                 "⏱️ Temps Mobilisation",
                 f"{data_actuelle['Temps_Mobilisation_Jours']:.1f} jours",
-                f"{reduction_temps:+.1f}%"
+                delta_metrique('Temps_Mobilisation_Jours', f"{reduction_temps:+.1f}%")
             )
         
         with col6:
-            croissance_ad = ((data_actuelle['Couverture_AD'] - data_2000['Couverture_AD']) / 
-                           data_2000['Couverture_AD']) * 100
+            croissance_ad = croissance['Couverture_AD']
             st.metric(
                 "🛡️ Défense Anti-Aérienne",
                 f"{data_actuelle['Couverture_AD']:.1f}%",
-                f"{croissance_ad:+.1f}%"
+                delta_metrique('Couverture_AD', f"{croissance_ad:+.1f}%")
             )
         
         with col7:
-            if 'Portee_Max_Missiles_Km' in df.columns:
-                croissance_portee = ((data_actuelle['Portee_Max_Missiles_Km'] - data_2000.get('Portee_Max_Missiles_Km', 300)) / 
-                                   data_2000.get('Portee_Max_Missiles_Km', 300)) * 100
+            if 'Portee_Max_Missiles_Km' in resume.columns:
+                croissance_portee = croissance['Portee_Max_Missiles_Km']
                 st.metric(
                     "🎯 Portée Missiles Max",
                     f"{data_actuelle['Portee_Max_Missiles_Km']:,.0f} km",
-                    f"{croissance_portee:+.1f}%"
+                    delta_metrique('Portee_Max_Missiles_Km', f"{croissance_portee:+.1f}%")
                 )
         
         with col8:
             st.metric(
                 "📊 Préparation Opérationnelle",
                 f"{data_actuelle['Readiness_Operative']:.1f}%",
-                f"+{(data_actuelle['Readiness_Operative'] - data_2000['Readiness_Operative']):.1f}%"
+                delta_metrique('Readiness_Operative',
+                               f"+{(data_actuelle['Readiness_Operative'] - data_2000['Readiness_Operative']):.1f}%")
             )
     
-    def create_comprehensive_analysis(self, df, config):
+    def create_scenario_delta_view(self, df, reference, resume, resume_base, scenario):
+        """Écarts des indicateurs du scénario par rapport au scénario de référence : valeurs finales et trajectoires"""
+        st.markdown(f'<h3 class="section-header">⚖️ ÉCART « {scenario} » / « {SCENARIO_REFERENCE} »</h3>', 
+                   unsafe_allow_html=True)
+        
+        ecarts = self.compute_kpi_deltas(resume, resume_base)
+        if ecarts.empty:
+            st.info("Ce scénario ne modifie aucune série de cette sélection")
+            return
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            self.reserve_figure(self.build_scenario_delta_figure, ecarts, scenario)
+        
+        with col2:
+            st.dataframe(ecarts.round(2), use_container_width=True)
+        
+        self.reserve_figure(self.build_scenario_difference_figure, df, reference, list(ecarts.index), scenario,
+                            cle=self.cle_vue)
+    
+    def compute_kpi_deltas(self, resume, resume_base):
+        """Écarts absolus et relatifs des valeurs finales, séries modifiées uniquement"""
+        final, final_base = resume.loc['Dernier'], resume_base.loc['Dernier']
+        ecarts = pd.DataFrame({
+            SCENARIO_REFERENCE: final_base,
+            'Scénario': final,
+            'Écart': final - final_base,
+            'Écart_Pct': (final - final_base) / final_base.replace(0, np.nan) * 100
+        })
+        return ecarts[ecarts['Écart'].abs() > 1e-9].sort_values('Écart_Pct')
+    
+    def build_scenario_delta_figure(self, ecarts, scenario):
+        """Barres divergentes des écarts relatifs au scénario de référence"""
+        fig = go.Figure(go.Bar(
+            x=ecarts['Écart_Pct'], y=ecarts.index, orientation='h',
+            marker_color=np.where(ecarts['Écart_Pct'] >= 0, '#239F40', '#DA0000'),
+            hovertemplate="%{y}: %{x:+.1f}%<extra></extra>"
+        ))
+        fig.add_vline(x=0, line_color='#2d3436')
+        fig.update_layout(title=f"⚖️ ÉCART FINAL (%) - {scenario.upper()}",
+                          height=max(300, 40 * len(ecarts)), template="plotly_white")
+        return fig
+    
+    def build_scenario_difference_figure(self, df, reference, colonnes, scenario):
+        """Trajectoire de l'écart relatif au scénario de référence, une trace par série modifiée"""
+        fig = go.Figure()
+        for colonne in colonnes:
+            base = reference[colonne].replace(0, np.nan)
+            fig.add_trace(go.Scatter(
+                x=df['Annee'], y=(df[colonne] - reference[colonne]) / base * 100, name=colonne, mode='lines',
+                hovertemplate=f"{colonne}: %{{y:+.1f}}%<extra></extra>"
+            ))
+        fig.add_hline(y=0, line_color='#2d3436')
+        fig.add_vline(x=ANNEE_BASCULE_SCENARIO, line_dash='dash', line_color='#636e72')
+        fig.update_layout(title=f"📉 ÉCART (%) AU FIL DU TEMPS - {scenario.upper()} / {SCENARIO_REFERENCE.upper()}",
+                          xaxis_title="Année", yaxis_title="Écart (%)", height=400, template="plotly_white")
+        return fig
+    
+    def create_comprehensive_analysis(self, df, config, prevision=None, reference=None):
         """Analyse complète multidimensionnelle"""
         st.markdown('<h3 class="section-header">📊 ANALYSE MULTIDIMENSIONNELLE</h3>', 
                    unsafe_allow_html=True)
@@ -568,64 +2144,73 @@ class DefenseIranDashboardAvance:
         
         with col1:
             # Évolution des capacités principales
-            fig = go.Figure()
-            
-            capacites = ['Readiness_Operative', 'Capacite_Dissuasion', 'Cyber_Capabilities', 'Couverture_AD']
-            noms = ['Préparation Opér.', 'Dissuasion Strat.', 'Capacités Cyber', 'Défense Anti-Aérienne']
-            couleurs = ['#239F40', '#DA0000', '#2d3436', '#4B0082']
-            
-            for i, (cap, nom, couleur) in enumerate(zip(capacites, noms, couleurs)):
-                if cap in df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=df['Annee'], y=df[cap],
-                        mode='lines', name=nom,
-                        line=dict(color=couleur, width=4),
-                        hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
-                    ))
-            
-            fig.update_layout(
-                title="📈 ÉVOLUTION DES CAPACITÉS STRATÉGIQUES (2000-2027)",
-                xaxis_title="Année",
-                yaxis_title="Niveau de Capacité (%)",
-                height=500,
-                template="plotly_white",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_capabilities_figure, df, prevision, reference, cle=self.cle_vue)
         
         with col2:
             # Analyse des programmes stratégiques
-            strategic_data = []
-            strategic_names = []
-            
-            if 'Stock_Missiles' in df.columns:
-                strategic_data.append(df['Stock_Missiles'] / 10)  # Normalisation
-                strategic_names.append('Stock Missiles (x10)')
-            
-            if 'Tests_Missiles' in df.columns:
-                strategic_data.append(df['Tests_Missiles'])
-                strategic_names.append('Tests de Missiles')
-            
-            if 'Forces_Proxies' in df.columns:
-                strategic_data.append(df['Forces_Proxies'])
-                strategic_names.append('Groupes Proxy')
-            
-            if strategic_data:
-                fig = make_subplots(specs=[[{"secondary_y": True}]])
-                
-                for i, (data, nom) in enumerate(zip(strategic_data, strategic_names)):
-                    fig.add_trace(
-                        go.Scatter(x=df['Annee'], y=data, name=nom,
-                                 line=dict(width=4)),
-                        secondary_y=(i > 0)
-                    )
-                
-                fig.update_layout(
-                    title="🚀 PROGRAMMES STRATÉGIQUES - ÉVOLUTION COMPARÉE",
-                    height=500,
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_strategic_programmes_figure, df, prevision, reference, cle=self.cle_vue)
+    
+    def build_capabilities_figure(self, df, prevision=None, reference=None):
+        """Graphique d'évolution des capacités stratégiques (avec prévisions éventuelles)"""
+        fig = go.Figure()
+        
+        capacites = ['Readiness_Operative', 'Capacite_Dissuasion', 'Cyber_Capabilities', 'Couverture_AD']
+        noms = ['Préparation Opér.', 'Dissuasion Strat.', 'Capacités Cyber', 'Défense Anti-Aérienne']
+        couleurs = ['#239F40', '#DA0000', '#2d3436', '#4B0082']
+        
+        for i, (cap, nom, couleur) in enumerate(zip(capacites, noms, couleurs)):
+            if cap in df.columns:
+                fig.add_trace(go.Scatter(
+                    x=df['Annee'], y=df[cap],
+                    mode='lines', name=nom,
+                    line=dict(color=couleur, width=4),
+                    hovertemplate=f"{nom}: %{{y:.1f}}%<extra></extra>"
+                ))
+                self.add_forecast_traces(fig, prevision, cap, nom, couleur)
+                self.add_reference_trace(fig, reference, df, cap, nom, couleur)
+        self.add_event_bands(fig, df['Annee'].min(), df['Annee'].max())
+        
+        fig.update_layout(
+            title=f"📈 ÉVOLUTION DES CAPACITÉS STRATÉGIQUES (2000-{df['Annee'].max():.0f})",
+            xaxis_title="Année",
+            yaxis_title="Niveau de Capacité (%)",
+            height=500,
+            template="plotly_white",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        return fig
+    
+    def build_strategic_programmes_figure(self, df, prevision=None, reference=None):
+        """Graphique comparé des programmes stratégiques (None si aucune donnée)"""
+        programmes = [
+            ('Stock_Missiles', 'Stock Missiles (x10)', 0.1),  # Normalisation
+            ('Tests_Missiles', 'Tests de Missiles', 1),
+            ('Forces_Proxies', 'Groupes Proxy', 1)
+        ]
+        programmes = [programme for programme in programmes if programme[0] in df.columns]
+        couleurs = ['#DA0000', '#239F40', '#4B0082']
+        
+        if not programmes:
+            return None
+        
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        for i, ((colonne, nom, facteur), couleur) in enumerate(zip(programmes, couleurs)):
+            fig.add_trace(
+                go.Scatter(x=df['Annee'], y=df[colonne] * facteur, name=nom,
+                         line=dict(width=4, color=couleur)),
+                secondary_y=(i > 0)
+            )
+            self.add_forecast_traces(fig, prevision, colonne, nom, couleur, facteur, secondary_y=(i > 0))
+            self.add_reference_trace(fig, reference, df, colonne, nom, couleur, facteur, secondary_y=(i > 0))
+        self.add_event_bands(fig, df['Annee'].min(), df['Annee'].max())
+        
+        fig.update_layout(
+            title="🚀 PROGRAMMES STRATÉGIQUES - ÉVOLUTION COMPARÉE",
+            height=500,
+            template="plotly_white"
+        )
+        return fig
     
     def create_geopolitical_analysis(self, df, config):
         """Analyse géopolitique avancée"""
@@ -659,30 +2244,90 @@ class DefenseIranDashboardAvance:
         
         with col2:
             # Analyse des sanctions
-            sanctions_data = {
-                'Année': [2006, 2010, 2012, 2015, 2018, 2020, 2022],
-                'Sanctions': ['Résolution 1737', 'Résolution 1929', 'Embargo pétrolier', 
-                            'JCPOA Temporaire', 'Retrait US JCPOA', 'Maximum Pressure', 'Nouvelles sanctions'],
-                'Impact': [5, 7, 8, 3, 7, 9, 8]  # sur 10
-            }
-            sanctions_df = pd.DataFrame(sanctions_data)
-            
-            fig = px.bar(sanctions_df, x='Année', y='Impact', 
-                        title="📉 IMPACT DES SANCTIONS INTERNATIONALES",
-                        labels={'Impact': 'Niveau d\'Impact'},
-                        color='Impact',
-                        color_continuous_scale='reds')
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_sanctions_figure, cle=())
             
             # Indice d'autosuffisance
-            autosuffisance = [min(40 + 3 * (annee - 2000), 85) for annee in df['Annee']]
-            fig = px.area(x=df['Annee'], y=autosuffisance,
-                         title="🛠️ AUTOSUFFISANCE MILITAIRE - RÉSILIENCE FACE AUX SANCTIONS",
-                         labels={'x': 'Année', 'y': 'Niveau d\'Autosuffisance (%)'})
-            fig.update_traces(fillcolor='rgba(218, 0, 0, 0.3)', line_color='#DA0000')
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_self_sufficiency_figure, df, cle=self.cle_vue)
+    
+    def build_sanctions_figure(self):
+        """Graphique de l'impact des sanctions internationales (notes sur 10 de la chronologie)"""
+        sanctions_df = self.chronologie.sanctions()
+        
+        fig = px.bar(sanctions_df, x='Année', y='Impact', 
+                    title="📉 IMPACT DES SANCTIONS INTERNATIONALES",
+                    labels={'Impact': 'Niveau d\'Impact'},
+                    color='Impact', hover_data=['Sanctions'],
+                    color_continuous_scale='reds')
+        fig.update_layout(height=400)
+        return fig
+    
+    def build_self_sufficiency_figure(self, df):
+        """Graphique de l'indice d'autosuffisance militaire"""
+        fig = px.area(x=df['Annee'], y=df['Autosuffisance_Militaire'],
+                     title="🛠️ AUTOSUFFISANCE MILITAIRE - RÉSILIENCE FACE AUX SANCTIONS",
+                     labels={'x': 'Année', 'y': 'Niveau d\'Autosuffisance (%)'})
+        fig.update_traces(fillcolor='rgba(218, 0, 0, 0.3)', line_color='#DA0000')
+        self.add_event_bands(fig, df['Annee'].min(), df['Annee'].max())
+        fig.update_layout(height=300)
+        return fig
+    
+    def create_analytics_view(self, analytics):
+        """Vue analytique : croissance, TCAC, statistiques glissantes et corrélations"""
+        st.markdown('<h3 class="section-header">📐 ANALYTIQUE DÉRIVÉE</h3>', 
+                   unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([3, 2])
+        
+        with col1:
+            self.reserve_figure(self.build_correlation_heatmap, analytics['correlations'], cle=self.cle_vue)
+        
+        with col2:
+            st.markdown("**📋 Synthèse par série**")
+            st.dataframe(analytics['synthese'].round(2), use_container_width=True, height=500)
+        
+        serie = st.selectbox("Série analysée:", list(analytics['synthese'].index))
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            self.reserve_figure(self.build_rolling_figure, analytics, serie, cle=(*self.cle_vue, serie))
+        
+        with col4:
+            self.reserve_figure(self.build_growth_figure, analytics, serie, cle=(*self.cle_vue, serie))
+    
+    def build_correlation_heatmap(self, correlations):
+        """Carte de chaleur des corrélations entre séries"""
+        fig = px.imshow(correlations, zmin=-1, zmax=1,
+                        color_continuous_scale='RdBu_r', aspect='auto',
+                        title="🧮 MATRICE DE CORRÉLATION DES SÉRIES")
+        fig.update_layout(height=600)
+        return fig
+    
+    def build_rolling_figure(self, analytics, serie):
+        """Moyenne glissante et bande de volatilité d'une série"""
+        annees = analytics['annees']
+        moyenne = analytics['moyenne_mobile'][serie]
+        volatilite = analytics['volatilite'][serie].fillna(0)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=annees, y=moyenne + volatilite, line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=annees, y=moyenne - volatilite, line=dict(width=0),
+                                 fill='tonexty', fillcolor='rgba(35, 159, 64, 0.2)',
+                                 name='± Volatilité'))
+        fig.add_trace(go.Scatter(x=annees, y=moyenne, name='Moyenne glissante',
+                                 line=dict(color='#239F40', width=3)))
+        fig.update_layout(title=f"📉 MOYENNE GLISSANTE ({FENETRE_ANALYTIQUE_ANS} ANS) - {serie}",
+                          height=400, template="plotly_white")
+        return fig
+    
+    def build_growth_figure(self, analytics, serie):
+        """Croissance annuelle d'une série"""
+        croissance = analytics['croissance_annuelle'][serie]
+        fig = go.Figure(go.Bar(x=analytics['annees'], y=croissance,
+                               marker_color=np.where(croissance >= 0, '#239F40', '#DA0000')))
+        fig.update_layout(title=f"📈 CROISSANCE ANNUELLE (%) - {serie}",
+                          height=400, template="plotly_white")
+        return fig
     
     def create_technical_analysis(self, df, config):
         """Analyse technique détaillée"""
@@ -693,42 +2338,11 @@ class DefenseIranDashboardAvance:
         
         with col1:
             # Analyse des systèmes d'armes
-            systems_data = {
-                'Système': ['Shahab-3', 'Ghadr', 'Fateh-110', 'Sous-marin Ghadir', 
-                           'Vedette Tondar', 'Drone Shahed-129', 'Bavar-373'],
-                'Portée (km)': [2000, 1600, 300, 3000, 200, 2000, 200],
-                'Année Service': [2003, 2007, 2002, 2007, 2002, 2012, 2019],
-                'Statut': ['Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel']
-            }
-            systems_df = pd.DataFrame(systems_data)
-            
-            fig = px.scatter(systems_df, x='Portée (km)', y='Année Service', 
-                           size='Portée (km)', color='Statut',
-                           hover_name='Système', log_x=True,
-                           title="🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_weapon_systems_figure, cle=())
         
         with col2:
             # Analyse de la modernisation
-            modernization_data = {
-                'Domaine': ['Missiles Balistiques', 'Défense Aérienne', 
-                          'Marine Asymétrique', 'Drones', 'Cyberguerre'],
-                'Niveau 2000': [40, 30, 35, 20, 25],
-                'Niveau 2027': [85, 75, 80, 70, 75]
-            }
-            modern_df = pd.DataFrame(modernization_data)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='2000', x=modern_df['Domaine'], y=modern_df['Niveau 2000'],
-                                marker_color='#239F40'))
-            fig.add_trace(go.Bar(name='2027', x=modern_df['Domaine'], y=modern_df['Niveau 2027'],
-                                marker_color='#DA0000'))
-            
-            fig.update_layout(title="📈 MODERNISATION DES CAPACITÉS MILITAIRES",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_modernization_figure, cle=())
             
             # Cartographie des installations
             st.markdown("""
@@ -741,6 +2355,45 @@ class DefenseIranDashboardAvance:
             </div>
             """, unsafe_allow_html=True)
     
+    def build_weapon_systems_figure(self):
+        """Graphique des caractéristiques des systèmes d'armes"""
+        systems_data = {
+            'Système': ['Shahab-3', 'Ghadr', 'Fateh-110', 'Sous-marin Ghadir', 
+                       'Vedette Tondar', 'Drone Shahed-129', 'Bavar-373'],
+            'Portée (km)': [2000, 1600, 300, 3000, 200, 2000, 200],
+            'Année Service': [2003, 2007, 2002, 2007, 2002, 2012, 2019],
+            'Statut': ['Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel', 'Opérationnel']
+        }
+        systems_df = pd.DataFrame(systems_data)
+        
+        fig = px.scatter(systems_df, x='Portée (km)', y='Année Service', 
+                       size='Portée (km)', color='Statut',
+                       hover_name='Système', log_x=True,
+                       title="🎯 CARACTÉRISTIQUES DES SYSTÈMES D'ARMES",
+                       size_max=30)
+        fig.update_layout(height=500)
+        return fig
+    
+    def build_modernization_figure(self):
+        """Graphique de modernisation des capacités militaires"""
+        modernization_data = {
+            'Domaine': ['Missiles Balistiques', 'Défense Aérienne', 
+                      'Marine Asymétrique', 'Drones', 'Cyberguerre'],
+            'Niveau 2000': [40, 30, 35, 20, 25],
+            'Niveau 2027': [85, 75, 80, 70, 75]
+        }
+        modern_df = pd.DataFrame(modernization_data)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(name='2000', x=modern_df['Domaine'], y=modern_df['Niveau 2000'],
+                            marker_color='#239F40'))
+        fig.add_trace(go.Bar(name='2027', x=modern_df['Domaine'], y=modern_df['Niveau 2027'],
+                            marker_color='#DA0000'))
+        
+        fig.update_layout(title="📈 MODERNISATION DES CAPACITÉS MILITAIRES",
+                         barmode='group', height=500)
+        return fig
+    
     def create_doctrinal_analysis(self, config):
         """Analyse doctrinale avancée"""
         st.markdown('<h3 class="section-header">📚 ANALYSE DOCTRINALE</h3>', 
@@ -801,47 +2454,24 @@ class DefenseIranDashboardAvance:
         st.markdown('<h3 class="section-header">⚠️ ÉVALUATION STRATÉGIQUE DES MENACES</h3>', 
                    unsafe_allow_html=True)
         
+        catalogue = cached_call('menaces', load_threat_catalog)
+        if catalogue['erreur']:
+            st.warning(f"Catalogue de menaces illisible, catalogue intégré utilisé : {catalogue['erreur']}")
+        if catalogue['illisibles']:
+            st.caption(f"{catalogue['illisibles']:,} menaces écartées : probabilité, impact, préparation ou exposition illisible")
+        
         col1, col2 = st.columns(2)
         
         with col1:
             # Matrice des menaces
-            threats_data = {
-                'Type de Menace': ['Frappe Israélienne', 'Intervention US', 'Guerre Navale', 
-                                 'Cyber Attaque', 'Soulèvement Interne', 'Blocus Économique'],
-                'Probabilité': [0.6, 0.4, 0.5, 0.8, 0.3, 0.7],
-                'Impact': [0.8, 0.9, 0.7, 0.6, 0.8, 0.9],
-                'Niveau Préparation': [0.9, 0.7, 0.8, 0.6, 0.5, 0.8]
-            }
-            threats_df = pd.DataFrame(threats_data)
-            
-            fig = px.scatter(threats_df, x='Probabilité', y='Impact', 
-                           size='Niveau Préparation', color='Type de Menace',
-                           title="🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT",
-                           size_max=30)
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            self.reserve_figure(self.build_threat_matrix_figure, catalogue['scores'], cle=(catalogue['empreinte'],))
         
         with col2:
-            # Capacités de réponse
-            response_data = {
-                'Scénario': ['Attaque Aérienne', 'Blocus Naval', 'Cyber Attaque', 
-                           'Opérations Spéciales', 'Guerre Régionale'],
-                'Missiles': [0.9, 0.7, 0.2, 0.6, 0.8],
-                'Marine': [0.4, 0.9, 0.1, 0.3, 0.6],
-                'Proxies': [0.3, 0.2, 0.1, 0.8, 0.7],
-                'Cyber': [0.2, 0.1, 0.9, 0.4, 0.5]
-            }
-            response_df = pd.DataFrame(response_data)
-            
-            fig = go.Figure(data=[
-                go.Bar(name='Missiles', x=response_df['Scénario'], y=response_df['Missiles']),
-                go.Bar(name='Marine', x=response_df['Scénario'], y=response_df['Marine']),
-                go.Bar(name='Proxies', x=response_df['Scénario'], y=response_df['Proxies']),
-                go.Bar(name='Cyber', x=response_df['Scénario'], y=response_df['Cyber'])
-            ])
-            fig.update_layout(title="🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO",
-                             barmode='group', height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            # Classement des menaces
+            self.render_threat_ranking(catalogue['scores'])
+        
+        # Capacités de réponse
+        self.reserve_figure(self.build_response_capabilities_figure, catalogue['capacites'], cle=(catalogue['empreinte'],))
         
         # Recommandations stratégiques
         st.markdown("""
@@ -858,34 +2488,347 @@ class DefenseIranDashboardAvance:
         </div>
         """, unsafe_allow_html=True)
     
+    @st.fragment
+    def render_threat_ranking(self, scores):
+        """Classement top-k et agrégats, réexécutés seuls à chaque interaction"""
+        col1, col2 = st.columns(2)
+        with col1:
+            critere = st.selectbox("Classer par:", list(CRITERES_CLASSEMENT), key='critere_menaces')
+        with col2:
+            k = st.number_input("Top:", min_value=1, max_value=len(scores), key='top_menaces',
+                                value=min(TOP_MENACES_DEFAUT, len(scores)))
+        
+        classement = self.rank_threats(scores, CRITERES_CLASSEMENT[critere], int(k))
+        st.dataframe(classement.round(3), use_container_width=True, height=350)
+        
+        st.markdown("**📊 Agrégats par catégorie**")
+        st.dataframe(self.aggregate_threats(scores).round(3), use_container_width=True)
+    
+    def build_threat_matrix_figure(self, scores):
+        """Matrice des risques probabilité / impact (menaces les plus risquées au-delà de POINTS_GRAPHIQUES)"""
+        titre = "🎯 MATRICE RISQUES - PROBABILITÉ VS IMPACT"
+        if len(scores) > POINTS_GRAPHIQUES:
+            scores = self.rank_threats(scores, 'Risque', POINTS_GRAPHIQUES)
+            titre += f" (TOP {POINTS_GRAPHIQUES:,} RISQUES)"
+        couleur = 'Type de Menace' if scores['Type de Menace'].nunique() <= 20 else 'Catégorie'
+        fig = px.scatter(scores, x='Probabilité', y='Impact', 
+                       size='Niveau Préparation', color=couleur,
+                       hover_data=['Risque', 'Écart_Couverture'],
+                       title=titre,
+                       size_max=30)
+        fig.update_layout(height=500)
+        return fig
+    
+    def build_response_capabilities_figure(self, capacites):
+        """Capacités de réponse par scénario"""
+        fig = go.Figure(data=[
+            go.Bar(name=capacite, x=capacites.index, y=capacites[capacite])
+            for capacite in CAPACITES_REPONSE
+        ])
+        fig.update_layout(title="🛡️ CAPACITÉS DE RÉPONSE PAR SCÉNARIO",
+                         barmode='group', height=500)
+        return fig
+    
+    def create_query_console(self):
+        """Console SQL sur les données de toutes les sélections et de tous les scénarios"""
+        st.markdown('<h3 class="section-header">🗄️ CONSOLE DE REQUÊTES SQL</h3>', 
+                   unsafe_allow_html=True)
+        st.caption(f"Table `donnees` : selection, scenario, Annee et une colonne par série "
+                   f"(résolution annuelle, {ANNEE_DEBUT}-{ANNEE_FIN}). Lecture seule, {LIMITE_RESULTATS_SQL:,} lignes au plus.")
+        self.render_query_console()
+    
+    def load_query_views(self):
+        """Données annuelles de chaque sélection × scénario, servies par le cache de simulation"""
+        return {
+            (selection, scenario): cached_call('simulation', load_simulation, selection, scenario, ANNEE_FIN, RESOLUTION_SQL)[0]
+            for selection in self.config_registry for scenario in SCENARIOS
+        }
+    
+    @st.fragment
+    def render_query_console(self):
+        """Saisie et résultats de la requête ; la base n'est synchronisée qu'à l'exécution demandée"""
+        st.session_state.setdefault('requete_sql', next(iter(EXEMPLES_SQL.values())))
+        st.selectbox("Exemple de requête:", list(EXEMPLES_SQL), index=None, key='exemple_sql',
+                     placeholder="Choisir un exemple...", on_change=self.choose_sql_example)
+        with st.form('console_sql', border=False):
+            requete = st.text_area("Requête SQL:", height=200, key='requete_sql')
+            executer = st.form_submit_button("▶️ Exécuter")
+        
+        if executer and requete.strip():
+            base = get_query_database()
+            rechargees = base.synchroniser(self.load_query_views()) if base.a_synchroniser() else 0
+            debut = time.perf_counter()
+            try:
+                resultat, tronque = base.executer(requete)
+            except sqlite3.Error as exc:
+                st.session_state.pop('resultat_sql', None)
+                st.error(f"Erreur SQL : {exc}")
+                return
+            st.session_state['resultat_sql'] = (resultat, tronque, (time.perf_counter() - debut) * 1000, rechargees)
+        
+        # Dernier résultat conservé pour la session : le choix du graphique ne relance pas la requête
+        if 'resultat_sql' not in st.session_state:
+            st.caption("Saisissez une requête puis cliquez sur « Exécuter » (Ctrl+Entrée).")
+            return
+        resultat, tronque, duree, rechargees = st.session_state['resultat_sql']
+        
+        st.caption(f"{len(resultat):,} lignes en {duree:.1f} ms"
+                   + (f" — résultat tronqué à {LIMITE_RESULTATS_SQL:,} lignes" if tronque else "")
+                   + (f" — {rechargees} vues rechargées" if rechargees else ""))
+        st.dataframe(resultat, use_container_width=True, height=350)
+        
+        numeriques = [colonne for colonne in resultat.select_dtypes('number').columns if colonne != resultat.columns[0]]
+        if resultat.empty or not numeriques:
+            return
+        
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            type_graphique = st.radio("Graphique:", ["Aucun", "Lignes", "Barres", "Nuage de points"], key='graphique_sql')
+            serie = st.selectbox("Série:", numeriques, key='serie_sql')
+        with col2:
+            if type_graphique != "Aucun":
+                st.plotly_chart(self.build_query_figure(resultat, type_graphique, serie), use_container_width=True)
+    
+    def choose_sql_example(self):
+        """Recopie l'exemple choisi dans la zone de saisie"""
+        exemple = st.session_state['exemple_sql']
+        if exemple:
+            st.session_state['requete_sql'] = EXEMPLES_SQL[exemple]
+    
+    def build_query_figure(self, resultat, type_graphique, serie):
+        """Graphique rapide d'un résultat : première colonne en abscisse, couleur par sélection ou scénario"""
+        x = resultat.columns[0]
+        couleur = next((colonne for colonne in ('selection', 'scenario') if colonne in resultat.columns and colonne != x), None)
+        tracer = {"Lignes": px.line, "Barres": px.bar, "Nuage de points": px.scatter}[type_graphique]
+        fig = tracer(resultat, x=x, y=serie, color=couleur)
+        fig.update_layout(height=400, template="plotly_white")
+        return fig
+    
+    def create_snapshot_view(self, controls):
+        """Versions des données : capture, choix de deux versions et écarts"""
+        st.markdown('<h3 class="section-header">🗃️ VERSIONS DES DONNÉES</h3>', 
+                   unsafe_allow_html=True)
+        self.render_snapshot_explorer(controls['selection'], controls['scenario'])
+    
+    def capture_snapshot(self, libelle):
+        """Capture les sorties de generate_advanced_data de chaque sélection × scénario"""
+        vues = {
+            (selection, scenario): self.generate_advanced_data(selection, scenario, ANNEE_FIN, RESOLUTION_INSTANTANES)[0]
+            for selection in self.config_registry for scenario in SCENARIOS
+        }
+        return get_snapshot_store().capturer(vues, libelle)
+    
+    @st.fragment
+    def render_snapshot_explorer(self, selection, scenario):
+        """Capture et comparaison, réexécutées seules à chaque interaction"""
+        magasin = get_snapshot_store()
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            libelle = st.text_input("Libellé de la version:", key='libelle_version',
+                                    placeholder="ex. recalibrage budget S42")
+        with col2:
+            st.write("")
+            capturer = st.button("📸 Capturer", key='capturer_version', use_container_width=True)
+        if capturer:
+            try:
+                with st.spinner("Capture en cours..."):
+                    identifiant, nouveaux, octets = self.capture_snapshot(libelle)
+                st.success(f"Version {identifiant} : {nouveaux} colonnes nouvelles ({octets / 1024:,.1f} Ko)")
+            except OSError as exc:
+                st.warning(f"Capture impossible, emplacement des versions non inscriptible : {exc}")
+        
+        # Lecture du disque et comparaison uniquement à la demande : l'onglet est rendu à chaque exécution
+        if not st.toggle("🔍 Parcourir et comparer les versions", key='parcourir_versions'):
+            return
+        try:
+            versions = magasin.versions()
+            objets, octets = magasin.taille()
+        except OSError as exc:
+            st.warning(f"Versions illisibles : {exc}")
+            return
+        st.caption(f"{len(versions)} versions • {objets:,} colonnes uniques • {octets / 2 ** 20:,.2f} Mo sur disque")
+        if len(versions) < 2:
+            st.info("Capturez au moins deux versions pour les comparer")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            version_a = st.selectbox("Version de référence:", versions, index=1, key='version_a',
+                                     format_func=lambda identifiant: self.format_version(magasin, identifiant))
+        with col2:
+            version_b = st.selectbox("Version comparée:", versions, index=0, key='version_b',
+                                     format_func=lambda identifiant: self.format_version(magasin, identifiant))
+        
+        debut = time.perf_counter()
+        try:
+            ecarts = magasin.comparer(version_a, version_b)
+        except (OSError, ValueError) as exc:
+            st.warning(f"Comparaison impossible : {exc}")
+            return
+        st.caption(f"{len(ecarts):,} colonnes différentes en {(time.perf_counter() - debut) * 1000:.1f} ms")
+        if ecarts.empty:
+            st.success("Aucune différence entre ces deux versions")
+            return
+        st.dataframe(ecarts, use_container_width=True, height=300)
+        
+        modifiees = ecarts[(ecarts['Sélection'] == selection) & (ecarts['Scénario'] == scenario)
+                           & (ecarts['Statut'] == 'Modifiée')]
+        if modifiees.empty:
+            st.caption(f"Aucune série modifiée pour « {selection} » / « {scenario} »")
+            return
+        
+        colonne = st.selectbox("Série de la vue courante:", list(modifiees['Colonne']), key='serie_version')
+        st.plotly_chart(self.build_snapshot_figure(magasin.charger(version_a, selection, scenario),
+                                                   magasin.charger(version_b, selection, scenario),
+                                                   colonne, version_a, version_b), use_container_width=True)
+    
+    def format_version(self, magasin, identifiant):
+        libelle = magasin.lire_version(identifiant)['libelle']
+        return f"{identifiant} — {libelle}" if libelle else identifiant
+    
+    def build_snapshot_figure(self, df_a, df_b, colonne, version_a, version_b):
+        """Superposition d'une série dans deux versions"""
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=df_a['Annee'], y=df_a[colonne], mode='lines', name=version_a,
+                                 line=dict(color='#2d3436', width=2, dash='dot')))
+        fig.add_trace(go.Scatter(x=df_b['Annee'], y=df_b[colonne], mode='lines+markers', name=version_b,
+                                 line=dict(color='#DA0000', width=3)))
+        fig.update_layout(title=f"🗃️ {colonne.replace('_', ' ').upper()} - VERSIONS",
+                          height=400, template="plotly_white")
+        return fig
+    
     def create_missile_database(self):
         """Base de données des systèmes de missiles"""
         st.markdown('<h3 class="section-header">🚀 BASE DE DONNÉES DES SYSTÈMES DE MISSILES</h3>', 
                    unsafe_allow_html=True)
         
-        missile_data = []
-        for nom, specs in self.missile_systems.items():
-            missile_data.append({
-                'Système': nom,
-                'Type': specs['type'],
-                'Portée (km)': specs['portee'],
-                'Précision': specs['precision'],
-                'Statut': specs['statut'],
-                'Classification': 'Stratégique' if specs['portee'] > 1000 else 'Tactique'
-            })
-        
-        missile_df = pd.DataFrame(missile_data)
+        donnees = cached_call('catalogue', load_missile_catalog)
+        if donnees['erreur']:
+            st.warning(f"Catalogue de missiles illisible, catalogue intégré utilisé : {donnees['erreur']}")
+        if donnees['agregats']['illisibles']:
+            st.caption(f"{donnees['agregats']['illisibles']:,} systèmes avec une portée ou une précision illisible")
+        self.render_missile_explorer(donnees['catalogue'], donnees['index'])
+        
+        with st.expander("📊 Agrégats par type et statut"):
+            st.dataframe(donnees['agregats']['type_statut'].round(1), use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Distribution des portées**")
+                st.dataframe(donnees['agregats']['portees'], use_container_width=True)
+            with col2:
+                st.markdown("**Distribution des précisions**")
+                st.dataframe(donnees['agregats']['precisions'], use_container_width=True)
+    
+    def build_missile_catalog(self):
+        """Catalogue brut des missiles : mesures telles que saisies (texte ou nombre)"""
+        return pd.DataFrame([
+            {'Système': nom, 'Type': specs['type'], 'Portée': specs['portee'],
+             'Précision': specs['precision'], 'Statut': specs['statut']}
+            for nom, specs in self.missile_systems.items()
+        ])
+    
+    def read_missile_file(self, chemin):
+        """Catalogue de missiles au format CSV (Système, Type, Portée, Précision, Statut)"""
+        catalogue = pd.read_csv(chemin, dtype=str, keep_default_na=False)
+        manquantes = [colonne for colonne in COLONNES_CATALOGUE if colonne not in catalogue.columns]
+        if manquantes:
+            raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+        if catalogue.empty:
+            raise ValueError("catalogue vide")
+        return catalogue[COLONNES_CATALOGUE]
+    
+    def parse_measures(self, valeurs, unite_cible, unite_defaut):
+        """Mesures textuelles (« 50m », « 1 600 km », « CEP ~0,5 km ») converties en une passe vectorisée.
+        
+        Renvoie les valeurs dans l'unité cible (NaN si illisibles) et l'unité relevée."""
+        textes = pd.Series(valeurs, dtype=str).str.lower().str.replace('[\\s\u00a0\u202f]', '', regex=True)
+        # Virgule des milliers seulement dans des groupes complets (« 1,600 ») ; sinon virgule décimale (« 0,500 »)
+        milliers = textes.str.match(MOTIF_MILLIERS)
+        textes = textes.str.replace(',', '', regex=False).where(milliers, textes.str.replace(',', '.', regex=False))
+        extraits = textes.str.extract(MOTIF_MESURE)
+        unites = extraits[1].replace('', unite_defaut)
+        facteurs = unites.map(UNITES_LONGUEUR) / UNITES_LONGUEUR[unite_cible]
+        return pd.to_numeric(extraits[0], errors='coerce') * facteurs, unites.where(facteurs.notna())
+    
+    def normalize_missile_catalog(self, catalogue):
+        """Colonnes numériques (portée en km, précision en m), unités relevées, classes et bandes"""
+        catalogue = catalogue.reset_index(drop=True)
+        portee, unite_portee = self.parse_measures(catalogue['Portée'], 'km', 'km')
+        precision, unite_precision = self.parse_measures(catalogue['Précision'], 'm', 'm')
+        
+        normalise = pd.DataFrame({
+            'Système': catalogue['Système'],
+            'Type': catalogue['Type'],
+            'Portée (km)': portee,
+            'Unité portée': unite_portee,
+            'Précision': catalogue['Précision'].astype(str),
+            'Précision (m)': precision,
+            'Unité précision': unite_precision,
+            'Statut': catalogue['Statut'],
+            'Classification': np.select([portee > 1000, portee.notna()], ['Stratégique', 'Tactique'], 'Inconnue')
+        })
+        for colonne, valeurs, bandes in (('Bande de portée', portee, BANDES_PORTEE),
+                                         ('Bande de précision', precision, BANDES_PRECISION)):
+            normalise[colonne] = (pd.cut(valeurs, bandes['bornes'], labels=bandes['libelles'])
+                                  .cat.add_categories('Inconnue').fillna('Inconnue').astype(str))
+        return normalise
+    
+    def aggregate_missile_catalog(self, catalogue):
+        """Agrégats par type et statut : effectifs, distribution des portées et des précisions"""
+        agregats = catalogue.groupby(['Type', 'Statut']).agg(
+            Systèmes=('Système', 'size'),
+            Portée_Min_km=('Portée (km)', 'min'),
+            Portée_Médiane_km=('Portée (km)', 'median'),
+            Portée_Max_km=('Portée (km)', 'max'),
+            Précision_Min_m=('Précision (m)', 'min'),
+            Précision_Médiane_m=('Précision (m)', 'median'),
+            Précision_Max_m=('Précision (m)', 'max')
+        )
+        return {
+            'type_statut': agregats,
+            'portees': pd.crosstab(catalogue['Type'], catalogue['Bande de portée']),
+            'precisions': pd.crosstab(catalogue['Type'], catalogue['Bande de précision']),
+            'illisibles': int(catalogue[['Portée (km)', 'Précision (m)']].isna().any(axis=1).sum())
+        }
+    
+    def build_catalog_index(self, catalogue):
+        """Index des filtres : masque booléen précalculé pour chaque valeur de chaque dimension"""
+        return {
+            dimension: {valeur: (catalogue[dimension] == valeur).to_numpy()
+                        for valeur in sorted(catalogue[dimension].unique())}
+            for dimension in DIMENSIONS_FILTRES
+        }
+    
+    def filter_catalog(self, index, taille, filtres):
+        """Combine les masques : OU entre valeurs d'une dimension, ET entre dimensions"""
+        masque = np.ones(taille, dtype=bool)
+        for dimension, valeurs in filtres.items():
+            if valeurs:
+                masque &= np.logical_or.reduce([index[dimension][valeur] for valeur in valeurs])
+        return masque
+    
+    @st.fragment
+    def render_missile_explorer(self, catalogue, index):
+        """Filtres et vues du catalogue, réexécutés seuls à chaque interaction"""
+        colonnes = st.columns(len(DIMENSIONS_FILTRES))
+        filtres = {}
+        for colonne, dimension in zip(colonnes, DIMENSIONS_FILTRES):
+            with colonne:
+                filtres[dimension] = st.multiselect(f"{dimension}:", list(index[dimension]),
+                                                    key=f"filtre_{slugify(dimension)}")
+        
+        selection = catalogue[self.filter_catalog(index, len(catalogue), filtres)]
         
         # Affichage interactif
         col1, col2 = st.columns([2, 1])
         
+        if selection.empty:
+            col1.info("Aucun système ne correspond aux filtres sélectionnés")
+            return
+        
         with col1:
-            fig = px.scatter(missile_df, x='Portée (km)', y='Précision',
-                           size='Portée (km)', color='Classification',
-                           hover_name='Système', log_x=True,
-                           title="🚀 CARACTÉRISTIQUES DES SYSTÈMES DE MISSILES",
-                           size_max=30)
-            fig.update_layout(height=500)
+            fig = self.build_timed(get_operational_metrics(), self.build_missile_figure, selection)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
@@ -894,7 +2837,7 @@ class DefenseIranDashboardAvance:
                 <h4>📋 INVENTAIRE MISSILISTIQUE</h4>
             """, unsafe_allow_html=True)
             
-            for missile in missile_data:
+            for missile in selection.head(LIMITE_INVENTAIRE).to_dict('records'):
                 st.markdown(f"""
                 <div style="background: rgba(255,255,255,0.1); padding: 0.5rem; margin: 0.2rem 0; border-radius: 5px;">
                     <strong>{missile['Système']}</strong><br>
@@ -903,55 +2846,126 @@ class DefenseIranDashboardAvance:
                 </div>
                 """, unsafe_allow_html=True)
             
+            if len(selection) > LIMITE_INVENTAIRE:
+                st.caption(f"... et {len(selection) - LIMITE_INVENTAIRE:,} autres systèmes")
+            
             st.markdown("</div>", unsafe_allow_html=True)
     
+    def build_missile_figure(self, missile_df):
+        """Graphique des caractéristiques des systèmes de missiles (systèmes à portée ou précision illisible écartés)"""
+        fig = px.scatter(missile_df.dropna(subset=['Portée (km)', 'Précision (m)']), x='Portée (km)', y='Précision (m)',
+                       size='Portée (km)', color='Classification',
+                       color_discrete_map={'Stratégique': '#DA0000', 'Tactique': '#239F40', 'Inconnue': '#636e72'},
+                       hover_name='Système', hover_data=['Type', 'Statut'], log_x=True, log_y=True,
+                       title="🚀 CARACTÉRISTIQUES DES SYSTÈMES DE MISSILES",
+                       size_max=30)
+        fig.update_layout(height=500)
+        return fig
+    
     def run_advanced_dashboard(self):
-        """Exécute le dashboard avancé complet"""
+        """Exécute le dashboard avancé complet ; chaque exécution est comptée et chronométrée, même en échec"""
+        metriques = get_operational_metrics()
+        debut_rerun = time.perf_counter()
+        issue = 'echec'
+        try:
+            self.render_dashboard(metriques, get_cache_warmup())
+            issue = 'succes'
+        finally:
+            metriques.incrementer('dashboard_reruns_total', issue=issue)
+            metriques.observer('dashboard_rerun_seconds', time.perf_counter() - debut_rerun, issue=issue)
+    
+    def render_dashboard(self, metriques, prechauffage):
+        """Barre latérale, en-tête, données de la vue et onglets"""
+        contexte = get_script_run_ctx()
+        if contexte is not None:
+            metriques.enregistrer_session(contexte.session_id)
+        
         # Sidebar avancé
         controls = self.create_advanced_sidebar()
+        self.display_permalink(controls)
+        self.display_warmup_status(prechauffage)
+        if st.session_state.get('selection_comptee') != controls['selection']:
+            st.session_state['selection_comptee'] = controls['selection']
+            prechauffage.enregistrer_usage(controls['selection'])
         
         # Header avancé
         self.display_advanced_header()
         
-        # Génération des données avancées
-        df, config = self.generate_advanced_data(controls['selection'])
+        # Génération des données avancées (flux par blocs, échantillonné et mis en cache) ;
+        # clés canoniques communes aux permaliens, au préchauffage et aux caches partagés
+        vue = (controls['selection'], controls['scenario'], controls['fin_horizon'], controls['resolution'])
+        self.cle_vue = (*vue, controls['annees_prevision'], controls['comparer'])
+        df, resume = cached_call('simulation', load_simulation, *vue)
+        analytics = cached_call('analytique', load_analytics, *vue)
+        config = self.get_advanced_config(controls['selection'])
+        self.create_export_panel(df, resume, analytics, controls)
+        
+        # Comparaison : la référence est déjà en cache, seul l'écart dépend du scénario
+        reference = resume_base = None
+        if controls['comparer']:
+            reference, resume_base = cached_call('simulation', load_simulation, controls['selection'], SCENARIO_REFERENCE,
+                                                 controls['fin_horizon'], controls['resolution'])
+        
+        # Prévisions : modèles ajustés une fois par vue, seul l'horizon est réévalué
+        prevision = None
+        if controls['annees_prevision'] > 0:
+            modeles = cached_call('prevision', load_forecast_models, *vue)
+            prevision = self.evaluate_forecast(modeles, controls['annees_prevision'])
         
         # Navigation par onglets avancés
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs([
             "📊 Tableau de Bord", 
             "🔬 Analyse Technique", 
             "🌍 Contexte Géopolitique", 
             "📚 Doctrine Militaire",
             "⚠️ Évaluation Menaces",
             "🚀 Systèmes de Missiles",
+            "📐 Analytique",
+            "🗄️ Requêtes SQL",
+            "🗃️ Versions",
             "💎 Synthèse Stratégique"
         ])
         
-        with tab1:
-            self.display_strategic_metrics(df, config)
-            self.create_comprehensive_analysis(df, config)
+        try:
+            with tab1, self.render_tab(metriques, 'tableau_de_bord'):
+                self.display_strategic_metrics(resume, config, analytics['synthese'], resume_base)
+                if reference is not None:
+                    self.create_scenario_delta_view(df, reference, resume, resume_base, controls['scenario'])
+                self.create_comprehensive_analysis(df, config, prevision, reference)
         
-        with tab2:
-            self.create_technical_analysis(df, config)
+            with tab2, self.render_tab(metriques, 'analyse_technique'):
+                self.create_technical_analysis(df, config)
         
-        with tab3:
-            if controls['show_geopolitical']:
-                self.create_geopolitical_analysis(df, config)
+            with tab3, self.render_tab(metriques, 'contexte_geopolitique'):
+                if controls['show_geopolitical']:
+                    self.create_geopolitical_analysis(df, config)
         
-        with tab4:
-            if controls['show_doctrinal']:
-                self.create_doctrinal_analysis(config)
+            with tab4, self.render_tab(metriques, 'doctrine_militaire'):
+                if controls['show_doctrinal']:
+                    self.create_doctrinal_analysis(config)
         
-        with tab5:
-            if controls['threat_assessment']:
-                self.create_threat_assessment(df, config)
+            with tab5, self.render_tab(metriques, 'evaluation_menaces'):
+                if controls['threat_assessment']:
+                    self.create_threat_assessment(df, config)
         
-        with tab6:
-            if controls['show_technical']:
-                self.create_missile_database()
+            with tab6, self.render_tab(metriques, 'systemes_missiles'):
+                if controls['show_technical']:
+                    self.create_missile_database()
         
-        with tab7:
-            self.create_strategic_synthesis(df, config, controls)
+            with tab7, self.render_tab(metriques, 'analytique'):
+                self.create_analytics_view(analytics)
+        
+            with tab8, self.render_tab(metriques, 'requetes_sql'):
+                self.create_query_console()
+        
+            with tab9, self.render_tab(metriques, 'versions'):
+                self.create_snapshot_view(controls)
+        
+            with tab10, self.render_tab(metriques, 'synthese_strategique'):
+                self.create_strategic_synthesis(df, config, controls)
+        finally:
+            # Graphiques déjà réservés remplis même si un onglet échoue : les emplacements ne restent pas en attente
+            self.flush_figures()
     
     def create_strategic_synthesis(self, df, config, controls):
         """Synthèse stratégique finale"""
@@ -1054,7 +3068,127 @@ class DefenseIranDashboardAvance:
         </div>
         """, unsafe_allow_html=True)
 
-# Lancement du dashboard avancé
-if __name__ == "__main__":
+@st.cache_data(max_entries=64, show_spinner="Simulation en cours...")
+def load_simulation(selection, scenario, fin, resolution):
+    """Consomme le flux de simulation : données échantillonnées pour les graphiques et résumé.
+    
+    Les scénarios alternatifs sont reconstruits à partir de la référence en cache et de leur écart
+    tant que l'échantillon de référence est complet (résumé exact) ; sinon le flux est rejoué."""
+    metriques = get_operational_metrics()
+    metriques.enregistrer_miss('simulation', (selection, scenario, fin, resolution))
+    dashboard = DefenseIranDashboardAvance()
+    total = dashboard.count_points(fin, resolution)
+    if scenario != SCENARIO_REFERENCE and total <= POINTS_GRAPHIQUES:
+        df_base, resume_base = cached_call('simulation', load_simulation, selection, SCENARIO_REFERENCE, fin, resolution)
+        delta = cached_call('delta_scenario', load_scenario_delta, selection, scenario, fin, resolution)
+        return dashboard.apply_scenario_delta(df_base, resume_base, delta)
+    
+    with metriques.mesurer('dashboard_generate_seconds', resolution=resolution):
+        blocs = dashboard.iter_advanced_data(selection, scenario, fin, resolution)
+        return dashboard.consume_stream(blocs, total)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_scenario_delta(selection, scenario, fin, resolution):
+    """Écart d'un scénario à la référence : seules les colonnes et années affectées sont calculées"""
+    get_operational_metrics().enregistrer_miss('delta_scenario', (selection, scenario, fin, resolution))
+    df_base, _ = cached_call('simulation', load_simulation, selection, SCENARIO_REFERENCE, fin, resolution)
+    return DefenseIranDashboardAvance().compute_scenario_delta(df_base, scenario)
+
+@st.cache_resource(max_entries=512, show_spinner=False)
+def load_figure(nom, cle, _builder, _args):
+    """Graphique partagé entre sessions, indexé par son nom et la clé de sa vue"""
+    metriques = get_operational_metrics()
+    metriques.enregistrer_miss('figure', (nom, cle))
+    with metriques.mesurer('dashboard_figure_build_seconds', figure=nom):
+        return serialize_figure(_builder(*_args))
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_analytics(selection, scenario, fin, resolution):
+    """Indicateurs dérivés, mis en cache avec les données de la même vue"""
+    get_operational_metrics().enregistrer_miss('analytique', (selection, scenario, fin, resolution))
+    df, _ = cached_call('simulation', load_simulation, selection, scenario, fin, resolution)
+    return DefenseIranDashboardAvance().compute_derived_analytics(df)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_forecast_models(selection, scenario, fin, resolution):
+    """Coefficients de tendance de toutes les séries, ajustés une fois par vue"""
+    get_operational_metrics().enregistrer_miss('prevision', (selection, scenario, fin, resolution))
+    df, _ = cached_call('simulation', load_simulation, selection, scenario, fin, resolution)
+    return DefenseIranDashboardAvance().fit_forecast_models(df)
+
+@st.cache_data(show_spinner=False)
+def load_missile_catalog():
+    """Catalogue normalisé, index de filtres et agrégats, construits une seule fois ;
+    DASHBOARD_MISSILES_FILE remplace le catalogue intégré"""
+    get_operational_metrics().enregistrer_miss('catalogue', ())
+    dashboard = DefenseIranDashboardAvance()
+    brut = dashboard.build_missile_catalog()
+    erreur = None
+    chemin = os.environ.get('DASHBOARD_MISSILES_FILE')
+    if chemin:
+        try:
+            brut = dashboard.read_missile_file(chemin)
+        except (OSError, ValueError) as exc:
+            erreur = f"{chemin} : {exc}"
+            logging.getLogger(__name__).warning("Catalogue de missiles illisible, %s", erreur)
+    
+    catalogue = dashboard.normalize_missile_catalog(brut)
+    return {'catalogue': catalogue, 'index': dashboard.build_catalog_index(catalogue),
+            'agregats': dashboard.aggregate_missile_catalog(catalogue), 'erreur': erreur}
+
+@st.cache_data(show_spinner=False)
+def load_threat_catalog():
+    """Catalogue des menaces scoré une seule fois ; DASHBOARD_THREATS_FILE remplace le catalogue intégré"""
+    get_operational_metrics().enregistrer_miss('menaces', ())
     dashboard = DefenseIranDashboardAvance()
-    dashboard.run_advanced_dashboard()
\ No newline at end of file
+    menaces, capacites = dashboard.define_threat_catalog()
+    erreur = None
+    illisibles = 0
+    chemin = os.environ.get('DASHBOARD_THREATS_FILE')
+    if chemin:
+        try:
+            menaces, illisibles = dashboard.read_threat_file(chemin)
+        except (OSError, ValueError) as exc:
+            erreur = f"{chemin} : {exc}"
+            logging.getLogger(__name__).warning("Catalogue de menaces illisible, %s", erreur)
+    
+    scores = dashboard.score_threats(menaces, capacites)
+    return {'scores': scores, 'capacites': capacites, 'empreinte': content_hash(scores), 'erreur': erreur,
+            'illisibles': illisibles}
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def load_view_export(selection, scenario, fin, resolution, format_export):
+    """Fichier d'export complet d'une vue, écrit une fois par vue et par format puis resservi"""
+    vue = (selection, scenario, fin, resolution, format_export)
+    get_operational_metrics().enregistrer_miss('export', vue)
+    nom = f"vue_{hashlib.sha256(repr(vue).encode('utf-8')).hexdigest()[:16]}.{FORMATS_EXPORT[format_export][0]}"
+    return DefenseIranDashboardAvance().write_view_export(os.path.join(get_export_jobs()['dossier'], nom), *vue)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def export_bytes(empreinte, format_export, _table):
+    """Octets d'export, mis en cache par empreinte de contenu et format"""
+    get_operational_metrics().enregistrer_miss('export', (empreinte, format_export))
+    return DefenseIranDashboardAvance().serialize_frame(_table, format_export)
+
+def start_server_services():
+    """Services de processus démarrés dès que le runtime Streamlit existe, avant toute session"""
+    from streamlit import runtime
+    while not runtime.exists():
+        time.sleep(0.05)
+    get_operational_metrics()
+    get_cache_warmup()
+
+def launch_server():
+    """Lancement direct (python Dashboard.py [options streamlit]) : serveur Streamlit dans ce processus"""
+    from streamlit.web import cli
+    threading.Thread(target=start_server_services, name="demarrage", daemon=True).start()
+    sys.argv = ["streamlit", "run", os.path.abspath(__file__), *sys.argv[1:]]
+    sys.exit(cli.main())
+
+# Lancement du dashboard avancé : exécution du script par Streamlit, ou démarrage du serveur
+if __name__ == "__main__":
+    if get_script_run_ctx() is None:
+        launch_server()
+    else:
+        dashboard = DefenseIranDashboardAvance()
+        dashboard.run_advanced_dashboard()
\ No newline at end of file
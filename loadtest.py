@@ -0,0 +1,253 @@
+# loadtest.py
+"""Banc de charge : N sessions simultanées rejouent un parcours de clics sur un seul worker Streamlit.
+
+Le banc lance `streamlit run Dashboard.py` en mode headless (un processus, donc un worker) et y
+connecte N clients websocket qui parlent le protocole du navigateur : BackMsg rerun_script avec
+l'état des widgets, ForwardMsg jusqu'à script_finished. Les sessions partagent donc le runtime,
+les caches et le pool de graphiques du worker, comme des analystes réels.
+
+    python loadtest.py --sessions 1 2 4 8 16 --iterations 2
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dashboard.py")
+
+BRANCHES = ["Marine de la RII", "Force Aérienne", "Basij", "Forces Quds", "Armée de Terre", "Garde Côtière"]
+PROGRAMMES = ["Cybersécurité", "Défense Aérienne", "Programme Nucléaire", "Drones de Combat", "Guerre de Proximité"]
+SCENARIOS = ["Tensions Régionales", "Sanctions Renforcées", "Conflit Ouvert", "Statut Quo"]
+SERIES = ["Budget_Defense_Mds", "Personnel_Milliers", "Couverture_AD", "Cyber_Capabilities"]
+CHAMPS_WIDGETS = {'checkbox': 'bool_value', 'radio': 'string_value', 'selectbox': 'string_value'}
+
+
+def parcours(numero):
+    """Parcours de clics d'une session ; décalé selon la session pour varier les clés de cache.
+
+    Chaque étape liste les widgets modifiés (type, libellé, valeur). Les changements d'onglet ne
+    déclenchent pas de rerun côté serveur : ils sont simulés par une interaction avec un widget
+    placé dans un onglet (série de la vue analytique).
+    """
+    choix = lambda options, pas=0: options[(numero + pas) % len(options)]
+    return [
+        ("mode_programmes", [('radio', "Mode d'analyse:", "Programmes Stratégiques")]),
+        ("programme", [('selectbox', "Programme stratégique:", choix(PROGRAMMES))]),
+        ("scenario", [('selectbox', "Scénario:", choix(SCENARIOS))]),
+        ("case_geopolitique", [('checkbox', "Contexte géopolitique", False)]),
+        ("mode_branches", [('radio', "Mode d'analyse:", "Analyse Branche Militaire")]),
+        ("branche", [('selectbox', "Branche militaire:", choix(BRANCHES))]),
+        ("onglet_analytique", [('selectbox', "Série analysée:", choix(SERIES))]),
+        ("scenario_bis", [('selectbox', "Scénario:", choix(SCENARIOS, 1))]),
+        ("case_menaces", [('checkbox', "Évaluation des menaces", False)]),
+        ("cases_retablies", [('checkbox', "Contexte géopolitique", True), ('checkbox', "Évaluation des menaces", True)]),
+        ("vue_systemique", [('radio', "Mode d'analyse:", "Vue Systémique")])
+    ]
+
+
+class SessionWebsocket:
+    """Session de navigateur simulée : état des widgets renvoyé à chaque rerun, comme le client web"""
+
+    def __init__(self, connexion, delai):
+        self.connexion = connexion
+        self.delai = delai
+        self.widgets = {}  # (type, libellé) → identifiant du dernier rendu
+        self.etats = {}    # identifiant → (champ protobuf, valeur)
+
+    def modifier(self, type_widget, libelle, valeur):
+        identifiant = self.widgets[(type_widget, libelle)]
+        self.etats[identifiant] = (CHAMPS_WIDGETS[type_widget], valeur)
+
+    def executer(self):
+        """Demande un rerun et lit les messages jusqu'à la fin du script ; renvoie les exceptions affichées"""
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        for identifiant, (champ, valeur) in self.etats.items():
+            etat = message.rerun_script.widget_states.widgets.add()
+            etat.id = identifiant
+            setattr(etat, champ, valeur)
+        self.connexion.send(message.SerializeToString())
+
+        exceptions = []
+        while True:
+            retour = ForwardMsg()
+            retour.ParseFromString(self.connexion.recv(timeout=self.delai))
+            type_message = retour.WhichOneof('type')
+            if type_message == 'script_finished':
+                return exceptions
+            if type_message != 'delta' or retour.delta.WhichOneof('type') != 'new_element':
+                continue
+
+            element = retour.delta.new_element
+            type_element = element.WhichOneof('type')
+            if type_element == 'exception':
+                exceptions.append(element.exception.message)
+            elif type_element in CHAMPS_WIDGETS:
+                widget = getattr(element, type_element)
+                self.widgets[(type_element, widget.label)] = widget.id
+
+
+def memoire_residente(pid):
+    """Mémoire résidente d'un processus en octets (0 si indisponible)"""
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def port_libre():
+    with socket.socket() as sonde:
+        sonde.bind(('127.0.0.1', 0))
+        return sonde.getsockname()[1]
+
+
+def demarrer_serveur(delai):
+    """Lance un worker Streamlit headless et attend qu'il réponde ; renvoie (processus, url du websocket)"""
+    port = port_libre()
+    # Pas de point de collecte des métriques ni de préchauffage pendant le banc (DASHBOARD_WARMUP=all pour le mesurer)
+    environnement = {'DASHBOARD_METRICS_PORT': '0', 'DASHBOARD_WARMUP': 'off', **os.environ}
+    serveur = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', SCRIPT, '--server.headless', 'true',
+         '--server.port', str(port), '--server.address', '127.0.0.1', '--browser.gatherUsageStats', 'false'],
+        env=environnement, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    echeance = time.monotonic() + delai
+    while time.monotonic() < echeance:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as reponse:
+                if reponse.status == 200:
+                    return serveur, f"ws://127.0.0.1:{port}/_stcore/stream"
+        except OSError:
+            if serveur.poll() is not None:
+                break
+            time.sleep(0.2)
+    serveur.kill()
+    raise RuntimeError("le serveur Streamlit n'a pas démarré")
+
+
+def arreter_serveur(serveur):
+    serveur.terminate()
+    try:
+        serveur.wait(10)
+    except subprocess.TimeoutExpired:
+        serveur.kill()
+
+
+def session_virtuelle(numero, url, iterations, delai, latences, erreurs, depart):
+    """Ouvre une session puis rejoue son parcours ; chaque rerun est chronométré.
+
+    Le parcours s'arrête au premier échec : les étapes suivantes dépendraient d'un état incohérent.
+    """
+    nom = "connexion"
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=delai) as connexion:
+            session = SessionWebsocket(connexion, delai)
+            depart.wait()
+            for nom, modifications in [("ouverture", [])] + parcours(numero) * iterations:
+                for modification in modifications:
+                    session.modifier(*modification)
+                debut = time.perf_counter()
+                exceptions = session.executer()
+                latences.append(time.perf_counter() - debut)
+                if exceptions:
+                    erreurs.append(f"session {numero} / {nom} : {exceptions[0]}")
+                    break
+    except Exception as exc:
+        erreurs.append(f"session {numero} / {nom} : {type(exc).__name__}: {exc}")
+        depart.abort()
+
+
+def palier(serveur, url, sessions, iterations, delai):
+    """Lance un palier de N sessions simultanées et mesure débit, latences et mémoire du worker"""
+    latences, erreurs = [], []
+    depart = threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=session_virtuelle, name=f"session-{numero}",
+                                args=(numero, url, iterations, delai, latences, erreurs, depart))
+               for numero in range(sessions)]
+    for thread in threads:
+        thread.start()
+
+    pic_memoire = [memoire_residente(serveur.pid)]
+    termine = threading.Event()
+
+    def echantillonner_memoire():
+        while not termine.wait(0.1):
+            pic_memoire[0] = max(pic_memoire[0], memoire_residente(serveur.pid))
+
+    echantillonneur = threading.Thread(target=echantillonner_memoire, daemon=True)
+    echantillonneur.start()
+
+    try:
+        depart.wait()
+    except threading.BrokenBarrierError:
+        pass  # Une session n'a pas pu se connecter : son erreur est déjà enregistrée
+    debut = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duree = time.perf_counter() - debut
+    termine.set()
+
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99]) * 1000 if latences else (np.nan,) * 3
+    return {
+        'sessions': sessions,
+        'reruns': len(latences),
+        'erreurs': len(erreurs),
+        'debit_reruns_s': len(latences) / duree,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'rss_max_mo': pic_memoire[0] / 2 ** 20,
+        'details_erreurs': erreurs[:5]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de charge multi-sessions d'un worker du dashboard")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help="paliers de sessions simultanées")
+    parser.add_argument('--iterations', type=int, default=2, help="répétitions du parcours par session")
+    parser.add_argument('--timeout', type=float, default=120, help="délai maximal d'un rerun (s)")
+    parser.add_argument('--froid', action='store_true', help="redémarrer le worker (caches vides) avant chaque palier")
+    parser.add_argument('--json', help="écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'reruns':>7} {'erreurs':>7} {'débit/s':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'RSS Mo':>8}")
+    resultats = []
+    serveur = url = None
+    try:
+        for sessions in args.sessions:
+            if serveur is None or args.froid:
+                if serveur is not None:
+                    arreter_serveur(serveur)
+                serveur, url = demarrer_serveur(args.timeout)
+            resultat = palier(serveur, url, sessions, args.iterations, args.timeout)
+            resultats.append(resultat)
+            print(f"{resultat['sessions']:>8} {resultat['reruns']:>7} {resultat['erreurs']:>7} "
+                  f"{resultat['debit_reruns_s']:>8.2f} {resultat['p50_ms']:>8.0f} {resultat['p95_ms']:>8.0f} "
+                  f"{resultat['p99_ms']:>8.0f} {resultat['rss_max_mo']:>8.0f}")
+            for erreur in resultat['details_erreurs']:
+                print(f"         ! {erreur}")
+    finally:
+        if serveur is not None:
+            arreter_serveur(serveur)
+
+    if args.json:
+        with open(args.json, 'w') as fichier:
+            json.dump(resultats, fichier, indent=2, default=float)
+
+
+if __name__ == "__main__":
+    main()